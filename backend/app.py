@@ -3,13 +3,25 @@ Main Flask application for the Feature Voting System.
 This module initializes the Flask app, configures CORS, and sets up the API routes.
 """
 
-from flask import Flask, jsonify
+from flask import Flask, request
 from flask_cors import CORS
 from routes.features import features_bp
 from routes.votes import votes_bp
-from models.database import init_db, get_db_connection
+from models.database import init_db, init_pool, get_pool, get_db_connection
+from utils.helpers import OrjsonProvider, json_response, json_bytes_response
+from utils.cache import TTLCache
+import orjson
 import os
 
+# Seconds /api/stats results are reused for polling clients
+STATS_CACHE_TTL = 2.0
+
+# Error bodies never change, so they are serialized once at import
+NOT_FOUND_BODY = orjson.dumps({'error': 'Endpoint not found'})
+METHOD_NOT_ALLOWED_BODY = orjson.dumps({'error': 'Method not allowed'})
+INTERNAL_ERROR_BODY = orjson.dumps({'error': 'Internal server error'})
+BAD_REQUEST_BODY = orjson.dumps({'error': 'Bad request - Invalid JSON'})
+
 def create_app():
     """
     Create and configure the Flask application.
@@ -17,29 +29,88 @@ def create_app():
     Returns:
         Flask: Configured Flask application instance
     """
-    # Create Flask app
+    # Create Flask app; request.get_json() and jsonify() decode and encode with orjson
     app = Flask(__name__)
+    app.json = OrjsonProvider(app)
     
     # App configuration
     app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'dev-secret-key-change-in-production')
     app.config['DEBUG'] = os.environ.get('FLASK_DEBUG', 'False').lower() == 'true'
     
-    # Enable CORS for all routes (allows frontend to make requests)
-    CORS(app, origins=[
-        "http://localhost:3000",    # React development server
-        "http://localhost:19006",   # Expo web
-        "exp://localhost:19000",    # Expo mobile
-        "http://127.0.0.1:3000",
-        "http://127.0.0.1:19006"
-    ])
-    
-    # Initialize database
+    # Enable CORS for all routes (allows frontend to make requests).
+    # Browsers cache preflight responses for max_age seconds, so repeated
+    # POST/DELETE calls skip the extra OPTIONS round-trip. Flask-CORS also
+    # sends 'Vary: Origin' because the allowed origin is echoed per request.
+    CORS(app,
+         origins=[
+             "http://localhost:3000",    # React development server
+             "http://localhost:19006",   # Expo web
+             "exp://localhost:19000",    # Expo mobile
+             "http://127.0.0.1:3000",
+             "http://127.0.0.1:19006"
+         ],
+         methods=["GET", "POST", "DELETE", "OPTIONS"],
+         allow_headers=["Content-Type"],
+         supports_credentials=False,
+         max_age=86400)
+    
+    # Open the connection pool, then initialize the database through it
+    init_pool()
     init_db()
     
     # Register API blueprints
     app.register_blueprint(features_bp)
     app.register_blueprint(votes_bp)
     
+    # Short-lived cache for /api/stats, dropped on every successful write
+    stats_cache = TTLCache(STATS_CACHE_TTL)
+    app.extensions['stats_cache'] = stats_cache
+    
+    @app.after_request
+    def invalidate_caches(response):
+        """Invalidate cached read results after a successful write."""
+        if request.method in ('POST', 'DELETE') and response.status_code < 400:
+            stats_cache.clear()
+            # Vote routes drop just the listings they touch; any other write
+            # (e.g. a feature delete cascading to its votes) drops them all
+            if request.blueprint != 'votes':
+                app.extensions['votes_cache'].clear()
+        return response
+    
+    # The index and health payloads are static; serialize them once per app
+    # since load balancers and uptime monitors hit them constantly
+    index_body = orjson.dumps({
+        'message': 'Feature Voting System API',
+        'version': '1.0.0',
+        'endpoints': {
+            'features': {
+                'GET /api/features': 'Get all features with vote counts',
+                'POST /api/features': 'Create a new feature',
+                'GET /api/features/<id>': 'Get a specific feature',
+                'DELETE /api/features/<id>': 'Delete a feature'
+            },
+            'votes': {
+                'POST /api/features/<id>/vote': 'Vote for a feature',
+                'DELETE /api/features/<id>/vote': 'Remove vote from a feature'
+            },
+            'users': {
+                'GET /api/users/<user_id>/votes': 'Get user\'s votes'
+            },
+            'health': {
+                'GET /api/health': 'Health check endpoint'
+            },
+            'stats': {
+                'GET /api/stats': 'Get database statistics',
+                'GET /api/pool-health': 'Get connection pool statistics'
+            }
+        }
+    })
+    health_body = orjson.dumps({
+        'status': 'healthy',
+        'message': 'Health check endpoint.',
+        'version': '1.0.0'
+    })
+    
     # Root endpoint
     @app.route('/')
     def index():
@@ -49,31 +120,7 @@ def create_app():
         Returns:
             JSON response with API information and available endpoints
         """
-        return jsonify({
-            'message': 'Feature Voting System API',
-            'version': '1.0.0',
-            'endpoints': {
-                'features': {
-                    'GET /api/features': 'Get all features with vote counts',
-                    'POST /api/features': 'Create a new feature',
-                    'GET /api/features/<id>': 'Get a specific feature',
-                    'DELETE /api/features/<id>': 'Delete a feature'
-                },
-                'votes': {
-                    'POST /api/features/<id>/vote': 'Vote for a feature',
-                    'DELETE /api/features/<id>/vote': 'Remove vote from a feature'
-                },
-                'users': {
-                    'GET /api/users/<user_id>/votes': 'Get user\'s votes'
-                },
-                'health': {
-                    'GET /api/health': 'Health check endpoint'
-                },
-                'stats': {
-                    'GET /api/stats': 'Get database statistics'
-                }
-            }
-        })
+        return json_bytes_response(index_body)
     
     # App health check endpoint
     @app.route('/api/health')
@@ -84,11 +131,7 @@ def create_app():
         Returns:
             JSON response with health check
         """
-        return jsonify({
-            'status': 'healthy',
-            'message': 'Health check endpoint.',
-            'version': '1.0.0'
-        }), 200
+        return json_bytes_response(health_body, 200)
     
     # Database stats endpoint
     @app.route('/api/stats')
@@ -99,50 +142,65 @@ def create_app():
         Returns:
             JSON response with database statistics
         """
+        stats = stats_cache.get('stats')
+        if stats is not None:
+            return json_response(stats, 200)
+        
         try:
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            
-            # Get feature count
-            cursor.execute('SELECT COUNT(*) as count FROM features')
-            feature_count = cursor.fetchone()['count']
-            
-            # Get vote count
-            cursor.execute('SELECT COUNT(*) as count FROM votes')
-            vote_count = cursor.fetchone()['count']
-            
-            conn.close()
+            generation = stats_cache.generation
+            with get_db_connection() as conn:
+                cursor = conn.cursor()
+                
+                # Get feature and vote counts in a single statement
+                cursor.execute('''
+                    SELECT 
+                        (SELECT COUNT(*) FROM features) as feature_count,
+                        (SELECT COUNT(*) FROM votes) as vote_count
+                ''')
+                row = cursor.fetchone()
             
             stats = {
-                'total_features': feature_count,
-                'total_votes': vote_count
+                'total_features': row['feature_count'],
+                'total_votes': row['vote_count']
             }
-            return jsonify(stats), 200
+            stats_cache.set('stats', stats, generation)
+            return json_response(stats, 200)
         except Exception as e:
             print(f"Error getting stats: {e}")
-            return jsonify({'error': 'Failed to get statistics'}), 500
+            return json_response({'error': 'Failed to get statistics'}, 500)
+    
+    # Connection pool stats endpoint
+    @app.route('/api/pool-health')
+    def get_pool_health():
+        """
+        Get connection pool statistics.
+        
+        Returns:
+            JSON response with connection pool sizing and usage
+        """
+        return json_response(get_pool().stats(), 200)
     
     # Global error handlers
     @app.errorhandler(404)
     def not_found(error):
         """Handle 404 errors globally."""
-        return jsonify({'error': 'Endpoint not found'}), 404
+        return json_bytes_response(NOT_FOUND_BODY, 404)
     
     @app.errorhandler(405)
     def method_not_allowed(error):
         """Handle 405 errors globally."""
-        return jsonify({'error': 'Method not allowed'}), 405
+        return json_bytes_response(METHOD_NOT_ALLOWED_BODY, 405)
     
     @app.errorhandler(500)
     def internal_error(error):
         """Handle 500 errors globally."""
-        return jsonify({'error': 'Internal server error'}), 500
+        return json_bytes_response(INTERNAL_ERROR_BODY, 500)
     
     # Handle JSON parsing errors
     @app.errorhandler(400)
     def bad_request(error):
         """Handle 400 errors globally."""
-        return jsonify({'error': 'Bad request - Invalid JSON'}), 400
+        return json_bytes_response(BAD_REQUEST_BODY, 400)
     
     return app
 
@@ -164,6 +222,7 @@ def run_app():
     print("  GET  /                     - API information")
     print("  GET  /api/health           - Health check")
     print("  GET  /api/stats            - Database statistics")
+    print("  GET  /api/pool-health      - Connection pool statistics")
     print("  GET  /api/features         - Get all features")
     print("  POST /api/features         - Create new feature")
     print("  GET  /api/features/<id>    - Get specific feature")
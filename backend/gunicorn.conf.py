@@ -0,0 +1,21 @@
+"""
+Gunicorn configuration for the Feature Voting System.
+Runs the API under gevent workers so one process can keep many requests in
+flight; settings can be overridden with the environment variables below.
+"""
+
+import os
+
+# Bind to the same host/port variables used by app.py
+bind = f"{os.environ.get('FLASK_HOST', '0.0.0.0')}:{os.environ.get('FLASK_PORT', 5000)}"
+
+# gevent workers monkey-patch the standard library before the app is
+# imported, so the connection pool's locks cooperate with greenlets; the app
+# must not call patch_all() itself. SQLite calls run in C and do not yield,
+# so a commit stalls its whole worker: run one worker per CPU by default.
+worker_class = 'gevent'
+workers = int(os.environ.get('GUNICORN_WORKERS', os.cpu_count() or 2))
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', 1000))
+
+# Each worker must open its own SQLite connections after forking
+preload_app = False
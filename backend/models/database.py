@@ -5,63 +5,273 @@ This module handles SQLite database initialization and schema management.
 
 import sqlite3
 import os
+import time
+from contextlib import contextmanager
 from config import Config
+from models.pool import ConnectionPool
 
 # Database configuration
 DATABASE_NAME = 'feature_voting.db'
 DATABASE_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', DATABASE_NAME)
 
-def get_db_connection():
+# Per-connection settings. synchronous=NORMAL is safe under WAL and avoids an
+# fsync on every commit; the rest keep temp data and hot pages in memory.
+CONNECTION_PRAGMAS = (
+    'PRAGMA foreign_keys=ON',
+    'PRAGMA busy_timeout=5000',
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA temp_store=MEMORY',
+    'PRAGMA mmap_size=268435456',
+    'PRAGMA cache_size=-20000',
+)
+
+# Prepared statements kept per connection. The models use fewer distinct SQL
+# strings than this, so every query after the first skips parsing.
+STATEMENT_CACHE_SIZE = 256
+
+# Pause before retrying a write transaction that found the database locked
+WRITE_RETRY_DELAY = 0.05
+
+# Bump SCHEMA_VERSION whenever SCHEMA_SQL changes so existing databases re-run it
+SCHEMA_VERSION = 3
+SCHEMA_SQL = f'''
+    BEGIN;
+    
+    -- vote_count is kept equal to the feature's number of votes by the
+    -- triggers below, so reads never aggregate the votes table
+    CREATE TABLE IF NOT EXISTS features (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        title TEXT NOT NULL,
+        description TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        vote_count INTEGER NOT NULL DEFAULT 0
+    );
+    
+    CREATE TABLE IF NOT EXISTS votes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        feature_id INTEGER NOT NULL,
+        user_id TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (feature_id) REFERENCES features (id) ON DELETE CASCADE,
+        UNIQUE(feature_id, user_id)
+    );
+    
+    -- Lookups by feature_id + user_id use the index behind
+    -- UNIQUE(feature_id, user_id); (user_id, feature_id) covers per-user vote
+    -- lists without table reads.
+    CREATE INDEX IF NOT EXISTS idx_votes_user_feature ON votes(user_id, feature_id);
+    
+    -- Entries of a single-column index are ordered by (feature_id, rowid), so
+    -- a feature's votes come back in id order without a sort
+    CREATE INDEX IF NOT EXISTS idx_votes_feature_id ON votes(feature_id);
+    
+    -- Single-column index made redundant by idx_votes_user_feature
+    DROP INDEX IF EXISTS idx_votes_user_id;
+    
+    -- Feature listings walk this index in order instead of sorting
+    CREATE INDEX IF NOT EXISTS idx_features_ranking
+        ON features(vote_count DESC, created_at DESC, id DESC);
+    
+    CREATE TRIGGER IF NOT EXISTS trg_votes_count_insert AFTER INSERT ON votes
+    BEGIN
+        UPDATE features SET vote_count = vote_count + 1 WHERE id = NEW.feature_id;
+    END;
+    
+    CREATE TRIGGER IF NOT EXISTS trg_votes_count_delete AFTER DELETE ON votes
+    BEGIN
+        UPDATE features SET vote_count = vote_count - 1 WHERE id = OLD.feature_id;
+    END;
+    
+    PRAGMA user_version = {SCHEMA_VERSION};
+    
+    COMMIT;
+'''
+
+# Schema version 1 databases predate features.vote_count
+SQL_ADD_VOTE_COUNT_COLUMN = 'ALTER TABLE features ADD COLUMN vote_count INTEGER NOT NULL DEFAULT 0'
+SQL_BACKFILL_VOTE_COUNT = (
+    'UPDATE features SET vote_count = (SELECT COUNT(*) FROM votes WHERE votes.feature_id = features.id)'
+)
+
+def is_memory_database(path):
+    """
+    Check whether a database path refers to an in-memory SQLite database.
+    
+    Args:
+        path (str): Database path or URI
+        
+    Returns:
+        bool: True for in-memory databases, False for file-backed ones
     """
-    Create and return a database connection with row factory for dict-like access.
+    return path == ':memory:' or 'mode=memory' in path or path.startswith('file::memory:')
+
+def apply_connection_pragmas(conn):
+    """
+    Apply the per-connection PRAGMAs to a freshly opened connection.
     
+    Args:
+        conn (sqlite3.Connection): Database connection to configure
+    """
+    for pragma in CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+
+def dict_factory(cursor, row):
+    """
+    Row factory that builds plain dictionaries keyed by column name.
+    Rows can be returned or serialized as-is without a dict() copy.
+    
+    Args:
+        cursor (sqlite3.Cursor): Cursor that produced the row
+        row (tuple): Raw row values
+        
+    Returns:
+        dict: Row data keyed by column name
+    """
+    fields = [column[0] for column in cursor.description]
+    return dict(zip(fields, row))
+
+def connect(path):
+    """
+    Open a new configured database connection with row factory for dict-like access.
+    
+    Args:
+        path (str): Database path or ``file:`` URI
+        
     Returns:
         sqlite3.Connection: Database connection object
     """
-    conn = sqlite3.connect(DATABASE_PATH)
-    conn.row_factory = sqlite3.Row  # This enables dict-like access to rows
+    # Pooled connections are handed between request threads. isolation_level=None
+    # disables the implicit deferred BEGIN; writes use write_transaction().
+    conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None,
+                           cached_statements=STATEMENT_CACHE_SIZE,
+                           uri=path.startswith('file:'))
+    conn.row_factory = dict_factory  # Rows come back as plain dictionaries
+    apply_connection_pragmas(conn)
     return conn
 
+# Process-wide connection pool, created by init_pool()
+_pool = None
+
+def get_database_path():
+    """
+    Get the configured database path.
+    
+    Returns:
+        str: Value of the DATABASE_PATH environment variable, or the default path
+    """
+    return os.environ.get('DATABASE_PATH', DATABASE_PATH)
+
+def init_pool(database_path=None, **pool_options):
+    """
+    Create the process-wide connection pool, replacing any existing one.
+    
+    Args:
+        database_path (str): Database path (defaults to get_database_path())
+        **pool_options: Sizing options forwarded to ConnectionPool
+        
+    Returns:
+        ConnectionPool: The new connection pool
+    """
+    global _pool
+    database_path = database_path or get_database_path()
+    
+    # Ensure data directory exists before the pool opens its first connections
+    if not is_memory_database(database_path):
+        os.makedirs(os.path.dirname(os.path.abspath(database_path)), exist_ok=True)
+    
+    close_pool()
+    _pool = ConnectionPool(database_path, connect, **pool_options)
+    return _pool
+
+def get_pool():
+    """
+    Get the process-wide connection pool, creating it on first use.
+    
+    Returns:
+        ConnectionPool: The active connection pool
+    """
+    if _pool is None:
+        init_pool()
+    return _pool
+
+def close_pool():
+    """Close the process-wide connection pool if one is open."""
+    global _pool
+    if _pool is not None:
+        _pool.close()
+        _pool = None
+
+@contextmanager
+def get_db_connection():
+    """
+    Borrow a connection from the pool for the duration of a ``with`` block.
+    The connection is returned to the pool (not closed) on exit.
+    
+    Yields:
+        sqlite3.Connection: Database connection object
+    """
+    with get_pool().connection() as conn:
+        yield conn
+
+@contextmanager
+def write_transaction(conn):
+    """
+    Run a block of writes inside BEGIN IMMEDIATE ... COMMIT.
+    
+    Taking the write lock up front means the transaction can never fail on
+    a read-to-write lock upgrade. If the database is still locked after
+    busy_timeout, BEGIN is retried once. Any exception rolls back.
+    
+    Args:
+        conn (sqlite3.Connection): Connection in autocommit mode
+        
+    Yields:
+        sqlite3.Cursor: Cursor for the writes
+    """
+    try:
+        conn.execute('BEGIN IMMEDIATE')
+    except sqlite3.OperationalError as e:
+        if 'locked' not in str(e):
+            raise
+        time.sleep(WRITE_RETRY_DELAY)
+        conn.execute('BEGIN IMMEDIATE')
+    
+    try:
+        yield conn.cursor()
+    except BaseException:
+        conn.execute('ROLLBACK')
+        raise
+    conn.execute('COMMIT')
+
 def init_db():
     """
     Initialize the database with required tables.
     This function creates the features and votes tables if they don't exist.
+    
+    The schema version is recorded in PRAGMA user_version, so once a database
+    is current, later calls (app reloads, extra workers) only read that pragma.
     """
-    # Ensure data directory exists
-    os.makedirs(os.path.dirname(DATABASE_PATH), exist_ok=True)
-    
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    # Create features table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS features (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            title TEXT NOT NULL,
-            description TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-    
-    # Create votes table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS votes (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            feature_id INTEGER NOT NULL,
-            user_id TEXT NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (feature_id) REFERENCES features (id) ON DELETE CASCADE,
-            UNIQUE(feature_id, user_id)
-        )
-    ''')
-    
-    # Create indexes for better performance
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_votes_feature_id ON votes(feature_id)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_votes_user_id ON votes(user_id)')
-    
-    conn.commit()
-    conn.close()
+    database_path = get_pool().database
+    
+    with get_db_connection() as conn:
+        # WAL lets readers run alongside the single writer. The journal mode is
+        # stored in the database file, so it only needs to be set once here.
+        if not is_memory_database(database_path):
+            conn.execute('PRAGMA journal_mode=WAL')
+        
+        if conn.execute('PRAGMA user_version').fetchone()['user_version'] >= SCHEMA_VERSION:
+            return
+        
+        # Add and backfill the vote_count column on databases created before it
+        columns = [row['name'] for row in conn.execute('PRAGMA table_info(features)')]
+        if columns and 'vote_count' not in columns:
+            with write_transaction(conn) as cursor:
+                cursor.execute(SQL_ADD_VOTE_COUNT_COLUMN)
+                cursor.execute(SQL_BACKFILL_VOTE_COUNT)
+        
+        # Create every table, index and trigger in one batch with a single commit
+        conn.executescript(SCHEMA_SQL)
     print("Database initialized successfully!")
 
 def migrate_database():
@@ -78,15 +288,13 @@ def reset_database():
     Reset the database by dropping all tables and recreating them.
     WARNING: This will delete all data!
     """
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    # Drop tables if they exist
-    cursor.execute('DROP TABLE IF EXISTS votes')
-    cursor.execute('DROP TABLE IF EXISTS features')
-    
-    conn.commit()
-    conn.close()
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        
+        # Drop tables if they exist and mark the schema as missing
+        cursor.execute('DROP TABLE IF EXISTS votes')
+        cursor.execute('DROP TABLE IF EXISTS features')
+        cursor.execute('PRAGMA user_version = 0')
     
     # Recreate tables
     init_db()
@@ -99,34 +307,36 @@ def get_database_stats():
     Returns:
         dict: Dictionary containing database statistics
     """
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    # Get feature count
-    cursor.execute('SELECT COUNT(*) as count FROM features')
-    feature_count = cursor.fetchone()['count']
-    
-    # Get vote count
-    cursor.execute('SELECT COUNT(*) as count FROM votes')
-    vote_count = cursor.fetchone()['count']
-    
-    # Get most voted feature
-    cursor.execute('''
-        SELECT f.title, COUNT(v.id) as vote_count
-        FROM features f
-        LEFT JOIN votes v ON f.id = v.feature_id
-        GROUP BY f.id
-        ORDER BY vote_count DESC
-        LIMIT 1
-    ''')
-    top_feature = cursor.fetchone()
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        
+        # Get both counts and the most voted feature in a single statement;
+        # the top feature is the first entry of the ranking index
+        cursor.execute('''
+            WITH top_feature AS (
+                SELECT title, vote_count
+                FROM features
+                ORDER BY vote_count DESC, created_at DESC, id DESC
+                LIMIT 1
+            )
+            SELECT 
+                (SELECT COUNT(*) FROM features) as feature_count,
+                (SELECT COUNT(*) FROM votes) as vote_count,
+                t.title as top_title,
+                t.vote_count as top_vote_count
+            FROM (SELECT 1)
+            LEFT JOIN top_feature t ON 1
+        ''')
+        row = cursor.fetchone()
     
-    conn.close()
+    top_feature = None
+    if row['top_title'] is not None:
+        top_feature = {'title': row['top_title'], 'vote_count': row['top_vote_count']}
     
     return {
-        'total_features': feature_count,
-        'total_votes': vote_count,
-        'top_feature': dict(top_feature) if top_feature else None
+        'total_features': row['feature_count'],
+        'total_votes': row['vote_count'],
+        'top_feature': top_feature
     }
 
 if __name__ == '__main__':
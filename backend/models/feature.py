@@ -3,8 +3,35 @@ Feature model for the Feature Voting System.
 This module contains the Feature class that handles database operations for features.
 """
 
-from models.database import get_db_connection
+from models.database import get_db_connection, write_transaction
 from datetime import datetime
+import hashlib
+
+# SQL statements, built once at import and reused by every call
+# vote_count is a column maintained by triggers on votes, so no JOIN is needed
+SQL_SELECT_WITH_VOTES = (
+    'SELECT id, title, description, created_at, updated_at, vote_count FROM features '
+)
+SQL_INSERT_FEATURE = 'INSERT INTO features (title, description) VALUES (?, ?)'
+SQL_GET_LAST_FEATURE_IDS = 'SELECT id FROM features ORDER BY id DESC LIMIT ?'
+SQL_UPDATE_FEATURE = (
+    'UPDATE features SET title = ?, description = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?'
+)
+SQL_GET_ALL_WITH_VOTES = (
+    SQL_SELECT_WITH_VOTES + 'ORDER BY vote_count DESC, created_at DESC, id DESC'
+)
+SQL_GET_PAGE_WITH_VOTES = SQL_GET_ALL_WITH_VOTES + ' LIMIT ? OFFSET ?'
+SQL_GET_BY_ID_WITH_VOTES = SQL_SELECT_WITH_VOTES + 'WHERE id = ?'
+SQL_COUNT_FEATURES = 'SELECT COUNT(*) AS count FROM features'
+SQL_GET_FINGERPRINT = (
+    'SELECT (SELECT COUNT(*) FROM features) AS feature_count, '
+    '(SELECT MAX(id) FROM features) AS max_feature_id, '
+    '(SELECT MAX(updated_at) FROM features) AS max_updated_at, '
+    '(SELECT COUNT(*) FROM votes) AS vote_count, '
+    '(SELECT MAX(id) FROM votes) AS max_vote_id'
+)
+SQL_GET_BY_ID = 'SELECT id, title, description, created_at, updated_at FROM features WHERE id = ?'
+SQL_DELETE_FEATURE = 'DELETE FROM features WHERE id = ?'
 
 class Feature:
     """
@@ -26,62 +53,109 @@ class Feature:
         Returns:
             bool: True if save was successful, False otherwise
         """
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        try:
-            if self.id is None:
-                # Create new feature
-                cursor.execute('''
-                    INSERT INTO features (title, description)
-                    VALUES (?, ?)
-                ''', (self.title, self.description))
-                self.id = cursor.lastrowid
-            else:
-                # Update existing feature
-                cursor.execute('''
-                    UPDATE features 
-                    SET title = ?, description = ?, updated_at = CURRENT_TIMESTAMP
-                    WHERE id = ?
-                ''', (self.title, self.description, self.id))
+        with get_db_connection() as conn:
+            try:
+                with write_transaction(conn) as cursor:
+                    if self.id is None:
+                        # Create new feature
+                        cursor.execute(SQL_INSERT_FEATURE, (self.title, self.description))
+                        self.id = cursor.lastrowid
+                    else:
+                        # Update existing feature
+                        cursor.execute(SQL_UPDATE_FEATURE, (self.title, self.description, self.id))
+                
+                return True
+            except Exception as e:
+                print(f"Error saving feature: {e}")
+                return False
+    
+    @staticmethod
+    def bulk_create(features):
+        """
+        Create several features with one executemany in a single write transaction.
+        
+        Args:
+            features (list): Dictionaries with a title and an optional description
+            
+        Returns:
+            list: IDs of the created features, in input order
             
-            conn.commit()
-            return True
-        except Exception as e:
-            print(f"Error saving feature: {e}")
-            return False
-        finally:
-            conn.close()
+        Raises:
+            sqlite3.Error: If an insert fails (no feature is created)
+        """
+        if not features:
+            return []
+        
+        rows = [(feature['title'], feature.get('description')) for feature in features]
+        
+        with get_db_connection() as conn:
+            # executemany does not set lastrowid; the write lock keeps other
+            # inserts out, so the newest IDs are the ones just created
+            with write_transaction(conn) as cursor:
+                cursor.executemany(SQL_INSERT_FEATURE, rows)
+                cursor.execute(SQL_GET_LAST_FEATURE_IDS, (len(rows),))
+                feature_ids = [row['id'] for row in cursor.fetchall()]
+        
+        feature_ids.reverse()
+        return feature_ids
     
     @staticmethod
-    def get_all_with_votes():
+    def get_all_with_votes(limit=None, offset=0):
         """
-        Get all features with their vote counts, ordered by vote count (descending).
+        Get features with their vote counts, ordered by vote count (descending).
+        
+        Args:
+            limit (int): Maximum number of features to return (optional, all if None)
+            offset (int): Number of features to skip when limit is given
         
         Returns:
             list: List of dictionaries containing feature data and vote counts
         """
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT 
-                f.id,
-                f.title,
-                f.description,
-                f.created_at,
-                f.updated_at,
-                COUNT(v.id) as vote_count
-            FROM features f
-            LEFT JOIN votes v ON f.id = v.feature_id
-            GROUP BY f.id
-            ORDER BY vote_count DESC, f.created_at DESC
-        ''')
-        
-        features = cursor.fetchall()
-        conn.close()
-        
-        return [dict(feature) for feature in features]
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            
+            # Let SQLite stop after the requested page instead of slicing in Python
+            if limit is not None:
+                cursor.execute(SQL_GET_PAGE_WITH_VOTES, (limit, offset))
+            else:
+                cursor.execute(SQL_GET_ALL_WITH_VOTES)
+            return cursor.fetchall()
+    
+    @staticmethod
+    def count():
+        """
+        Get the total number of features.
+        
+        Returns:
+            int: Number of features
+        """
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute(SQL_COUNT_FEATURES)
+            result = cursor.fetchone()
+        
+        return result['count']
+    
+    @staticmethod
+    def get_fingerprint():
+        """
+        Get a cheap validator that changes whenever features or votes change.
+        
+        Inserts raise the AUTOINCREMENT maximums, deletes lower the row
+        counts and updates bump features.updated_at, so the combination
+        changes on every write without aggregating votes per feature.
+        
+        Returns:
+            str: Hex digest identifying the current state of both tables
+        """
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute(SQL_GET_FINGERPRINT)
+            state = tuple(cursor.fetchone().values())
+        
+        return hashlib.sha1(repr(state).encode()).hexdigest()
     
     @staticmethod
     def get_by_id(feature_id):
@@ -94,12 +168,11 @@ class Feature:
         Returns:
             Feature: Feature object if found, None otherwise
         """
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT * FROM features WHERE id = ?', (feature_id,))
-        feature_data = cursor.fetchone()
-        conn.close()
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute(SQL_GET_BY_ID, (feature_id,))
+            feature_data = cursor.fetchone()
         
         if feature_data:
             return Feature(
@@ -111,33 +184,43 @@ class Feature:
             )
         return None
     
+    @staticmethod
+    def get_by_id_with_votes(feature_id):
+        """
+        Get a feature by its ID together with its vote count in a single query.
+        
+        Args:
+            feature_id (int): The ID of the feature to retrieve
+            
+        Returns:
+            dict: Feature data with vote_count if found, None otherwise
+        """
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute(SQL_GET_BY_ID_WITH_VOTES, (feature_id,))
+            return cursor.fetchone()
+    
     @staticmethod
     def delete(feature_id):
         """
         Delete a feature and all its votes.
+        Votes are removed by the ON DELETE CASCADE foreign key.
         
         Args:
             feature_id (int): The ID of the feature to delete
             
         Returns:
-            bool: True if deletion was successful, False otherwise
+            bool: True if the feature was deleted, False if it did not exist
+            
+        Raises:
+            sqlite3.Error: If the deletion fails (the transaction is rolled back)
         """
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        try:
-            # Delete associated votes first (cascading delete)
-            cursor.execute('DELETE FROM votes WHERE feature_id = ?', (feature_id,))
-            # Delete the feature
-            cursor.execute('DELETE FROM features WHERE id = ?', (feature_id,))
+        with get_db_connection() as conn:
+            with write_transaction(conn) as cursor:
+                cursor.execute(SQL_DELETE_FEATURE, (feature_id,))
             
-            conn.commit()
             return cursor.rowcount > 0
-        except Exception as e:
-            print(f"Error deleting feature: {e}")
-            return False
-        finally:
-            conn.close()
     
     def to_dict(self):
         """
@@ -0,0 +1,191 @@
+"""
+SQLite connection pool for the Feature Voting System.
+This module keeps a bounded set of open, pre-configured connections so that
+request handlers do not pay connect and PRAGMA setup costs on every call.
+"""
+
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+class ConnectionPool:
+    """
+    Thread-safe pool of SQLite connections.
+
+    Idle connections are reused most-recently-released first so the hottest
+    page caches stay in use, and connections idle for longer than
+    ``idle_timeout`` are closed as long as ``min_size`` connections remain.
+    """
+
+    def __init__(self, database, connect, min_size=2, max_size=10, idle_timeout=300.0,
+                 ping_after=30.0):
+        """
+        Create the pool and pre-open ``min_size`` connections.
+
+        Args:
+            database (str): Database path or URI passed to ``connect``
+            connect (callable): Factory returning a configured connection for a path
+            min_size (int): Number of connections kept open while idle
+            max_size (int): Maximum number of open connections
+            idle_timeout (float): Seconds an idle connection may be kept above ``min_size``
+            ping_after (float): Seconds a connection may sit idle before it is
+                                pinged on acquire; busier connections skip the ping
+        """
+        self.database = database
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.ping_after = ping_after
+        self._connect = connect
+        self._idle = deque()  # (connection, released_at), oldest on the left
+        self._size = 0
+        self._closed = False
+        self._condition = threading.Condition()
+
+        for _ in range(min_size):
+            self._size += 1
+            self._idle.append((self._open(), time.monotonic()))
+
+    def _open(self):
+        """Open a new connection, releasing the reserved slot on failure."""
+        try:
+            return self._connect(self.database)
+        except Exception:
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            raise
+
+    def _discard(self, conn):
+        """Close a connection and free its slot in the pool."""
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        with self._condition:
+            self._size -= 1
+            self._condition.notify()
+
+    @staticmethod
+    def _is_healthy(conn):
+        """Ping a connection before handing it out."""
+        try:
+            conn.execute('SELECT 1')
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _reap_idle(self, now):
+        """
+        Collect connections that have been idle for too long.
+        Must be called with the condition held; returns connections to close.
+        """
+        expired = []
+        while len(self._idle) > self.min_size and now - self._idle[0][1] > self.idle_timeout:
+            expired.append(self._idle.popleft()[0])
+        return expired
+
+    def acquire(self, timeout=30.0):
+        """
+        Take a connection from the pool, opening a new one if below ``max_size``.
+
+        Args:
+            timeout (float): Seconds to wait for a free connection
+
+        Returns:
+            sqlite3.Connection: Pooled database connection
+
+        Raises:
+            TimeoutError: If no connection became available in time
+            RuntimeError: If the pool has been closed
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            conn = None
+            with self._condition:
+                while True:
+                    if self._closed:
+                        raise RuntimeError('Connection pool is closed')
+                    if self._idle:
+                        conn, released_at = self._idle.pop()
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError('Timed out waiting for a database connection')
+                    self._condition.wait(remaining)
+
+            if conn is None:
+                return self._open()
+            # A connection released moments ago is still good; only ping
+            # ones that have been idle long enough to have gone stale
+            if time.monotonic() - released_at < self.ping_after or self._is_healthy(conn):
+                return conn
+            self._discard(conn)
+
+    def release(self, conn):
+        """
+        Return a connection to the pool, rolling back any unfinished transaction.
+
+        Args:
+            conn (sqlite3.Connection): Connection previously returned by acquire()
+        """
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            self._discard(conn)
+            return
+
+        now = time.monotonic()
+        with self._condition:
+            if self._closed:
+                expired = [conn]
+            else:
+                self._idle.append((conn, now))
+                expired = self._reap_idle(now)
+                self._condition.notify()
+
+        for stale in expired:
+            self._discard(stale)
+
+    @contextmanager
+    def connection(self):
+        """Context manager that acquires a connection and releases it on exit."""
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def stats(self):
+        """
+        Get a snapshot of the pool state.
+
+        Returns:
+            dict: Pool sizing and usage counters
+        """
+        with self._condition:
+            idle = len(self._idle)
+            return {
+                'size': self._size,
+                'idle': idle,
+                'in_use': self._size - idle,
+                'min_size': self.min_size,
+                'max_size': self.max_size,
+            }
+
+    def close(self):
+        """Close all idle connections; connections in use are closed on release."""
+        with self._condition:
+            self._closed = True
+            idle = [conn for conn, _ in self._idle]
+            self._idle.clear()
+            self._condition.notify_all()
+
+        for conn in idle:
+            self._discard(conn)
@@ -3,11 +3,54 @@ Vote model for the Feature Voting System.
 This module contains the Vote class that handles database operations for votes.
 """
 
-from models.database import get_db_connection
-import uuid
+from models.database import get_db_connection, write_transaction
+from utils.helpers import generate_user_id
+import sqlite3
 
 from typing import Optional, List
 
+# SQL statements, built once at import and reused by every call
+SQL_INSERT_VOTE = (
+    'INSERT INTO votes (feature_id, user_id) VALUES (?, ?) '
+    'ON CONFLICT (feature_id, user_id) DO NOTHING'
+)
+SQL_DELETE_VOTE = 'DELETE FROM votes WHERE feature_id = ? AND user_id = ?'
+SQL_HAS_VOTED = 'SELECT 1 FROM votes WHERE feature_id = ? AND user_id = ? LIMIT 1'
+SQL_GET_USER_VOTES = 'SELECT feature_id FROM votes WHERE user_id = ?'
+SQL_COUNT_USER_VOTES = 'SELECT COUNT(*) AS count FROM votes WHERE user_id = ?'
+SQL_GET_USER_VOTED_FEATURES = (
+    'SELECT f.id, f.title, f.description, f.created_at, f.updated_at, f.vote_count '
+    'FROM votes v JOIN features f ON f.id = v.feature_id WHERE v.user_id = ? ORDER BY v.id'
+)
+# Vote counts are read from features.vote_count, which triggers keep current
+SQL_COUNT_FEATURE_VOTES = (
+    'SELECT COALESCE((SELECT vote_count FROM features WHERE id = ?), 0) AS count'
+)
+# Votes in the order they were cast, walked from idx_votes_feature_id without
+# a sort; callers number them (vote_number) as the rows are read
+SQL_GET_FEATURE_VOTES = (
+    'SELECT id, feature_id, user_id, created_at FROM votes WHERE feature_id = ? ORDER BY id'
+)
+SQL_COUNT_VOTES_FOR_FEATURES = 'SELECT id AS feature_id, vote_count AS count FROM features WHERE id IN ({})'
+
+# Messages for the constraint failures a vote insert can hit
+INTEGRITY_ERROR_MESSAGES = {
+    'SQLITE_CONSTRAINT_FOREIGNKEY': 'Feature not found',
+    'SQLITE_CONSTRAINT_UNIQUE': 'User has already voted for this feature',
+}
+
+def integrity_error_message(error):
+    """
+    Map a failed vote insert to the result message the routes branch on.
+    
+    Args:
+        error (sqlite3.IntegrityError): Error raised by the insert
+        
+    Returns:
+        str: Result message for the violated constraint
+    """
+    return INTEGRITY_ERROR_MESSAGES.get(error.sqlite_errorname, 'Error adding vote')
+
 class Vote:
     """
     Vote model representing a user's vote for a feature.
@@ -29,41 +72,117 @@ class Vote:
             user_id (str): The ID of the user voting (optional, generates UUID if None)
             
         Returns:
-            dict: Result dictionary with success status and message
+            dict: Result dictionary with success status and message; on
+                  success it also holds user_id and the new vote_count
         """
         # Generate a user ID if not provided
         if user_id is None:
-            user_id = str(uuid.uuid4())
-        
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        try:
-            # Check if feature exists
-            cursor.execute('SELECT id FROM features WHERE id = ?', (feature_id,))
-            if not cursor.fetchone():
-                return {'success': False, 'message': 'Feature not found'}
-            
-            # Check if user has already voted
-            cursor.execute('SELECT id FROM votes WHERE feature_id = ? AND user_id = ?', 
-                         (feature_id, user_id))
-            if cursor.fetchone():
-                return {'success': False, 'message': 'User has already voted for this feature'}
-            
-            # Add the vote
-            cursor.execute('''
-                INSERT INTO votes (feature_id, user_id)
-                VALUES (?, ?)
-            ''', (feature_id, user_id))
-            
-            conn.commit()
-            return {'success': True, 'message': 'Vote added successfully', 'user_id': user_id}
-        
-        except Exception as e:
-            print(f"Error adding vote: {e}")
-            return {'success': False, 'message': 'Error adding vote'}
-        finally:
-            conn.close()
+            user_id = generate_user_id()
+        
+        with get_db_connection() as conn:
+            try:
+                # Add the vote in a single statement: the foreign key rejects
+                # unknown features and the UNIQUE constraint skips duplicates.
+                # The trigger has bumped vote_count by the time it is read back.
+                with write_transaction(conn) as cursor:
+                    cursor.execute(SQL_INSERT_VOTE, (feature_id, user_id))
+                    if cursor.rowcount == 0:
+                        return {'success': False, 'message': 'User has already voted for this feature'}
+                    cursor.execute(SQL_COUNT_FEATURE_VOTES, (feature_id,))
+                    vote_count = cursor.fetchone()['count']
+                
+                return {'success': True, 'message': 'Vote added successfully', 'user_id': user_id,
+                        'vote_count': vote_count}
+            
+            except sqlite3.IntegrityError as e:
+                return {'success': False, 'message': integrity_error_message(e)}
+            except Exception as e:
+                print(f"Error adding vote: {e}")
+                return {'success': False, 'message': 'Error adding vote'}
+    
+    @staticmethod
+    def add_votes(votes):
+        """
+        Add several votes in a single write transaction.
+        Each vote is inserted by its own statement so a duplicate, an unknown
+        feature or a value SQLite cannot bind only fails that vote, and the
+        updated vote counts for every feature voted for are read back with
+        one grouped query. Repeats within
+        the batch (double submits, votes for a feature already found missing)
+        are answered without running another statement.
+        
+        Args:
+            votes (list): (feature_id, user_id) pairs
+            
+        Returns:
+            list: Result dictionaries in input order; successful results
+                  also carry user_id and the feature's vote_count
+        """
+        if not votes:
+            return []
+        
+        results = []
+        recorded = set()  # pairs inserted or found already present in this batch
+        missing_features = set()
+        
+        with get_db_connection() as conn:
+            try:
+                with write_transaction(conn) as cursor:
+                    for feature_id, user_id in votes:
+                        if feature_id in missing_features:
+                            results.append({'success': False, 'message': 'Feature not found'})
+                            continue
+                        try:
+                            repeated = (feature_id, user_id) in recorded
+                        except TypeError:
+                            # Unhashable user_id (e.g. a list); SQLite cannot bind it either
+                            results.append({'success': False, 'message': 'Error adding vote'})
+                            continue
+                        if repeated:
+                            results.append({'success': False, 'message': 'User has already voted for this feature'})
+                            continue
+                        
+                        try:
+                            cursor.execute(SQL_INSERT_VOTE, (feature_id, user_id))
+                        except sqlite3.IntegrityError as e:
+                            if e.sqlite_errorname == 'SQLITE_CONSTRAINT_FOREIGNKEY':
+                                missing_features.add(feature_id)
+                            results.append({'success': False, 'message': integrity_error_message(e)})
+                            continue
+                        except (sqlite3.Error, OverflowError) as e:
+                            # A failed statement leaves the transaction open, so
+                            # only this vote fails; if SQLite rolled the whole
+                            # transaction back, the batch cannot continue
+                            if not conn.in_transaction:
+                                raise
+                            print(f"Error adding vote: {e}")
+                            results.append({'success': False, 'message': 'Error adding vote'})
+                            continue
+                        
+                        recorded.add((feature_id, user_id))
+                        if cursor.rowcount == 0:
+                            results.append({'success': False, 'message': 'User has already voted for this feature'})
+                        else:
+                            results.append({'success': True, 'message': 'Vote added successfully', 'user_id': user_id})
+                    
+                    # Only features that took a vote need a count, which also keeps
+                    # unbindable feature IDs out of the grouped query
+                    feature_ids = list({feature_id for (feature_id, _), result in zip(votes, results)
+                                        if result['success']})
+                    counts = {}
+                    if feature_ids:
+                        placeholders = ', '.join('?' * len(feature_ids))
+                        cursor.execute(SQL_COUNT_VOTES_FOR_FEATURES.format(placeholders), feature_ids)
+                        counts = {row['feature_id']: row['count'] for row in cursor}
+            
+            except Exception as e:
+                print(f"Error adding votes: {e}")
+                return [{'success': False, 'message': 'Error adding vote'} for _ in votes]
+        
+        for (feature_id, _), result in zip(votes, results):
+            if result['success']:
+                result['vote_count'] = counts.get(feature_id, 0)
+        return results
     
     @staticmethod
     def remove_vote(feature_id, user_id):
@@ -75,26 +194,26 @@ class Vote:
             user_id (str): The ID of the user
             
         Returns:
-            dict: Result dictionary with success status and message
-        """
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        try:
-            cursor.execute('DELETE FROM votes WHERE feature_id = ? AND user_id = ?', 
-                         (feature_id, user_id))
-            conn.commit()
-            
-            if cursor.rowcount > 0:
-                return {'success': True, 'message': 'Vote removed successfully'}
-            else:
-                return {'success': False, 'message': 'Vote not found'}
-        
-        except Exception as e:
-            print(f"Error removing vote: {e}")
-            return {'success': False, 'message': 'Error removing vote'}
-        finally:
-            conn.close()
+            dict: Result dictionary with success status and message; on
+                  success it also holds the new vote_count
+        """
+        with get_db_connection() as conn:
+            try:
+                # Delete the vote and read the remaining count from the row the
+                # trigger just updated, in the same transaction
+                with write_transaction(conn) as cursor:
+                    cursor.execute(SQL_DELETE_VOTE, (feature_id, user_id))
+                    if cursor.rowcount == 0:
+                        return {'success': False, 'message': 'Vote not found'}
+                    cursor.execute(SQL_COUNT_FEATURE_VOTES, (feature_id,))
+                    vote_count = cursor.fetchone()['count']
+                
+                return {'success': True, 'message': 'Vote removed successfully',
+                        'vote_count': vote_count}
+
+            except Exception as e:
+                print(f"Error removing vote: {e}")
+                return {'success': False, 'message': 'Error removing vote'}
     
     @staticmethod
     def has_voted(feature_id, user_id):
@@ -108,13 +227,11 @@ class Vote:
         Returns:
             bool: True if user has voted, False otherwise
         """
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT id FROM votes WHERE feature_id = ? AND user_id = ?', 
-                     (feature_id, user_id))
-        result = cursor.fetchone()
-        conn.close()
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute(SQL_HAS_VOTED, (feature_id, user_id))
+            result = cursor.fetchone()
         
         return result is not None
     
@@ -129,15 +246,51 @@ class Vote:
         Returns:
             list: List of feature IDs the user has voted for
         """
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT feature_id FROM votes WHERE user_id = ?', (user_id,))
-        votes = cursor.fetchall()
-        conn.close()
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute(SQL_GET_USER_VOTES, (user_id,))
+            votes = cursor.fetchall()
         
         return [vote['feature_id'] for vote in votes]     
 
+    @staticmethod
+    def get_user_votes_with_features(user_id):
+        """
+        Get the features a user has voted for, with their vote counts, in one query.
+        
+        Args:
+            user_id (str): The ID of the user
+            
+        Returns:
+            list: Feature dictionaries with vote_count, in the order the user voted
+        """
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute(SQL_GET_USER_VOTED_FEATURES, (user_id,))
+            return cursor.fetchall()
+    
+    @staticmethod
+    def count_user_votes(user_id):
+        """
+        Get the number of features a user has voted for.
+        Counted from the (user_id, feature_id) index without reading the table.
+        
+        Args:
+            user_id (str): The ID of the user
+            
+        Returns:
+            int: Number of votes by the user
+        """
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute(SQL_COUNT_USER_VOTES, (user_id,))
+            result = cursor.fetchone()
+        
+        return result['count']
+    
     @staticmethod
     def get_vote_count(feature_id):
         """
@@ -149,12 +302,11 @@ class Vote:
         Returns:
             int: Number of votes for the feature
         """
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT COUNT(*) as count FROM votes WHERE feature_id = ?', (feature_id,))
-        result = cursor.fetchone()
-        conn.close()
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute(SQL_COUNT_FEATURE_VOTES, (feature_id,))
+            result = cursor.fetchone()
         
         return result['count']
     
@@ -167,13 +319,43 @@ class Vote:
             feature_id (int): The ID of the feature
             
         Returns:
-            list: List of dictionaries containing vote data
+            list: List of dictionaries containing vote data, each with its
+                  1-based vote_number in the order the votes were cast
         """
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute(SQL_GET_FEATURE_VOTES, (feature_id,))
+            votes = cursor.fetchall()
         
-        cursor.execute('SELECT * FROM votes WHERE feature_id = ?', (feature_id,))
-        votes = cursor.fetchall()
-        conn.close()
+        for vote_number, vote in enumerate(votes, 1):
+            vote['vote_number'] = vote_number
+        return votes
+    
+    @staticmethod
+    def iter_votes_by_feature(feature_id, batch_size=500):
+        """
+        Get the votes for a feature in batches without loading them all at once.
+        The pooled connection is held until the generator is exhausted or closed.
         
-        return [dict(vote) for vote in votes]
\ No newline at end of file
+        Args:
+            feature_id (int): The ID of the feature
+            batch_size (int): Number of votes per batch
+            
+        Yields:
+            list: Up to batch_size dictionaries containing vote data, numbered
+                  by vote_number across batches as they are read
+        """
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute(SQL_GET_FEATURE_VOTES, (feature_id,))
+            vote_number = 0
+            while True:
+                batch = cursor.fetchmany(batch_size)
+                if not batch:
+                    return
+                for vote in batch:
+                    vote_number += 1
+                    vote['vote_number'] = vote_number
+                yield batch
@@ -0,0 +1,113 @@
+"""
+Coalescing vote writer for the Feature Voting System.
+This module funnels concurrent vote requests through one background thread
+that writes them in batches, so a burst of votes shares a single write
+transaction and commit instead of paying for one each.
+"""
+
+import queue
+import threading
+from models.vote import Vote
+
+class _PendingVote:
+    """A queued vote waiting for the writer thread to record it."""
+
+    __slots__ = ('feature_id', 'user_id', 'result', 'error', 'done')
+
+    def __init__(self, feature_id, user_id):
+        self.feature_id = feature_id
+        self.user_id = user_id
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+
+class VoteWriter:
+    """
+    Single background writer that batches queued votes through Vote.add_votes.
+
+    The thread is started on the first submission and exits after
+    ``idle_timeout`` seconds without work, so idle apps hold no thread.
+    """
+
+    def __init__(self, max_batch=64, idle_timeout=1.0):
+        """
+        Create the writer; no thread is started until a vote is submitted.
+
+        Args:
+            max_batch (int): Maximum number of votes written per transaction
+            idle_timeout (float): Seconds the thread waits for work before exiting
+        """
+        self.max_batch = max_batch
+        self.idle_timeout = idle_timeout
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def submit(self, feature_id, user_id, timeout=30.0):
+        """
+        Queue a vote and wait until it has been written.
+
+        Args:
+            feature_id (int): The ID of the feature to vote for
+            user_id (str): The ID of the user voting
+            timeout (float): Seconds to wait for the write
+
+        Returns:
+            dict: Result dictionary from Vote.add_votes for this vote
+
+        Raises:
+            TimeoutError: If the vote was not written in time
+            Exception: Whatever the batch write raised, re-raised in the caller
+        """
+        pending = _PendingVote(feature_id, user_id)
+        self._queue.put(pending)
+        self._ensure_running()
+
+        if not pending.done.wait(timeout):
+            raise TimeoutError('Timed out waiting for the vote writer')
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    def _ensure_running(self):
+        """Start the writer thread if it is not running."""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='vote-writer', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        """Drain the queue in batches until it stays empty for idle_timeout."""
+        while True:
+            try:
+                batch = [self._queue.get(timeout=self.idle_timeout)]
+            except queue.Empty:
+                # Re-check under the lock so a vote queued just now is not stranded
+                with self._lock:
+                    if self._queue.empty():
+                        self._thread = None
+                        return
+                continue
+
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            self._flush(batch)
+
+    def _flush(self, batch):
+        """Write one batch and wake every waiting submitter."""
+        try:
+            results = Vote.add_votes([(p.feature_id, p.user_id) for p in batch])
+        except Exception as e:
+            # Hand the failure to every submitter in the batch
+            for pending in batch:
+                pending.error = e
+                pending.done.set()
+            return
+
+        for pending, result in zip(batch, results):
+            pending.result = result
+            pending.done.set()
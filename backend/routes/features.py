@@ -3,9 +3,9 @@ Feature routes for the Feature Voting System.
 This module defines the REST API endpoints for managing features.
 """
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request
+from utils.helpers import json_response
 from models.feature import Feature
-from models.vote import Vote
 
 features_bp = Blueprint('features', __name__)
 
@@ -29,45 +29,46 @@ def create_feature():
         
         # Validate required fields
         if not data:
-            return jsonify({'error': 'No data provided'}), 400
+            return json_response({'error': 'No data provided'}, 400)
         
-        if data.get('title') is None:
-            return jsonify({'error': 'Title is required'}), 400
+        # Look up and strip each field once
+        raw_title = data.get('title')
+        if raw_title is None:
+            return json_response({'error': 'Title is required'}, 400)
         
-        if not data.get('title').strip():
-            return jsonify({'error': 'Title cannot be empty'}), 400
+        title = raw_title.strip()
+        if not title:
+            return json_response({'error': 'Title cannot be empty'}, 400)
         
         # Validate title length
-        if len(data.get('title', '')) > 200:
-            return jsonify({'error': 'Title too long (max 200 characters)'}), 400
+        if len(raw_title) > 200:
+            return json_response({'error': 'Title too long (max 200 characters)'}, 400)
         
         # Validate description length
-        if len(data.get('description', '')) > 1000:
-            return jsonify({'error': 'Description too long (max 1000 characters)'}), 400
+        raw_description = data.get('description', '')
+        if len(raw_description) > 1000:
+            return json_response({'error': 'Description too long (max 1000 characters)'}, 400)
         
         # Create new feature
-        feature = Feature(
-            title=data['title'].strip(),
-            description=data.get('description', '').strip()
-        )
+        feature = Feature(title=title, description=raw_description.strip())
         
         # Save to database
         if feature.save():
             # Return the created feature with vote count
-            return jsonify({
+            return json_response({
                 'id': feature.id,
                 'title': feature.title,
                 'description': feature.description,
                 'created_at': feature.created_at,
                 'updated_at': feature.updated_at,
                 'vote_count': 0
-            }), 201
+            }, 201)
         else:
-            return jsonify({'error': 'Failed to create feature'}), 500
+            return json_response({'error': 'Failed to create feature'}, 500)
             
     except Exception as e:
         print(f"Error creating feature: {e}")
-        return jsonify({'error': 'Internal server error'}), 500
+        return json_response({'error': 'Internal server error'}, 500)
 
 @features_bp.route('/api/features', methods=['GET'])
 def get_features():
@@ -75,34 +76,51 @@ def get_features():
     Get all features with their vote counts.
     
     Query parameters:
-    - limit: Maximum number of features to return (optional)
-    - offset: Number of features to skip (optional)
+    - limit: Maximum number of features to return (optional, at least 1)
+    - offset: Number of features to skip (optional, not negative)
     
     Returns:
-        JSON response with list of features and their vote counts
+        JSON response with list of features and their vote counts,
+        or 304 Not Modified if the client's ETag is still current
     """
     try:
         # Get query parameters
         limit = request.args.get('limit', type=int)
         offset = request.args.get('offset', type=int, default=0)
         
-        # Get all features with vote counts
-        features = Feature.get_all_with_votes()
-        
-        # Apply pagination if limit is specified
-        if limit:
-            features = features[offset:(offset + limit)]
+        # SQLite reads a negative LIMIT as "no limit", so reject it up front
+        if limit is not None and limit < 1:
+            return json_response({'error': 'Limit must be at least 1'}, 400)
+        if offset < 0:
+            return json_response({'error': 'Offset must not be negative'}, 400)
+        
+        # Skip the aggregate and JSON encoding when nothing has changed
+        etag = f'{Feature.get_fingerprint()}-{limit}-{offset}'
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+            response.set_etag(etag)
+            return response
+        
+        # Get features with vote counts, paginated in SQL if limit is specified
+        if limit is not None:
+            features = Feature.get_all_with_votes(limit=limit, offset=offset)
+            total_count = Feature.count()
+        else:
+            features = Feature.get_all_with_votes()
+            total_count = len(features)
         
         # Return features
-        return jsonify({
+        response = json_response({
             'features': features,
-            'total_count': len(Feature.get_all_with_votes()),
+            'total_count': total_count,
             'returned_count': len(features)
-        }), 200
+        })
+        response.set_etag(etag)
+        return response, 200
         
     except Exception as e:
         print(f"Error getting features: {e}")
-        return jsonify({'error': 'Internal server error'}), 500
+        return json_response({'error': 'Internal server error'}, 500)
 
 @features_bp.route('/api/features/<int:feature_id>', methods=['GET'])
 def get_feature(feature_id):
@@ -116,24 +134,17 @@ def get_feature(feature_id):
         JSON response with feature data or error message
     """
     try:
-        # Get feature by ID
-        feature = Feature.get_by_id(feature_id)
-        
-        if not feature:
-            return jsonify({'error': 'Feature not found'}), 404
+        # Get feature by ID together with its vote count
+        feature_data = Feature.get_by_id_with_votes(feature_id)
         
-        # Get vote count for this feature
-        vote_count = Vote.get_vote_count(feature_id)
+        if not feature_data:
+            return json_response({'error': 'Feature not found'}, 404)
         
-        # Return feature with vote count
-        feature_data = feature.to_dict()
-        feature_data['vote_count'] = vote_count
-        
-        return jsonify(feature_data), 200
+        return json_response(feature_data, 200)
         
     except Exception as e:
         print(f"Error getting feature: {e}")
-        return jsonify({'error': 'Internal server error'}), 500
+        return json_response({'error': 'Internal server error'}, 500)
 
 @features_bp.route('/api/features/<int:feature_id>', methods=['DELETE'])
 def delete_feature(feature_id):
@@ -147,17 +158,12 @@ def delete_feature(feature_id):
         JSON response with success/error message
     """
     try:
-        # Check if feature exists
-        feature = Feature.get_by_id(feature_id)
-        if not feature:
-            return jsonify({'error': 'Feature not found'}), 404
-        
-        # Delete feature
+        # Delete feature; nothing deleted means it did not exist
         if Feature.delete(feature_id):
-            return jsonify({'message': 'Feature deleted successfully'}), 200
+            return json_response({'message': 'Feature deleted successfully'}, 200)
         else:
-            return jsonify({'error': 'Failed to delete feature'}), 500
+            return json_response({'error': 'Feature not found'}, 404)
             
     except Exception as e:
         print(f"Error deleting feature: {e}")
-        return jsonify({'error': 'Internal server error'}), 500
\ No newline at end of file
+        return json_response({'error': 'Internal server error'}, 500)
\ No newline at end of file
@@ -3,14 +3,71 @@ Vote routes for the Feature Voting System.
 This module defines the REST API endpoints for managing votes.
 """
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, stream_with_context
+from werkzeug.exceptions import HTTPException
 from models.vote import Vote
+from models.vote_writer import VoteWriter
 from models.feature import Feature
-import uuid
+from utils.cache import TTLCache
+from utils.helpers import json_endpoint, json_response, parse_json_object, read_json_object
+from utils.log import get_logger
+import itertools
+import orjson
+import secrets
 
 votes_bp = Blueprint('votes', __name__)
+logger = get_logger(__name__)
+
+# Seconds vote listings are served from memory. Each gunicorn worker has its
+# own cache, so this also bounds how stale another worker's view can be.
+VOTES_CACHE_TTL = 5.0
+
+# Feature vote listings longer than this are streamed in batches and never
+# cached; shorter ones are encoded in one go and cached like user listings
+VOTES_STREAM_THRESHOLD = 1000
+
+# HTTP status for each add_vote failure message; anything else is a bad request
+VOTE_ERROR_STATUS = {
+    'Feature not found': 404,
+    'User has already voted for this feature': 409,  # Conflict
+}
+
+# Anonymous voters get a random per-process prefix plus a counter, which is
+# unique without reading os.urandom on every vote. The prefix is drawn at
+# import, i.e. after gunicorn forks each worker.
+_anonymous_prefix = secrets.token_hex(8)
+_anonymous_counter = itertools.count()
+
+def generate_anonymous_user_id():
+    """Generate a unique user ID for a vote cast without one."""
+    return f'{_anonymous_prefix}-{next(_anonymous_counter):x}'
+
+@votes_bp.record_once
+def init_vote_writer(state):
+    """Give each app its own writer that batches concurrent votes."""
+    state.app.extensions['vote_writer'] = VoteWriter()
+
+@votes_bp.record_once
+def init_votes_cache(state):
+    """Give each app its own cache of vote listings."""
+    state.app.extensions['votes_cache'] = TTLCache(VOTES_CACHE_TTL)
+
+@votes_bp.errorhandler(Exception)
+def handle_unexpected_error(error):
+    """Log any unexpected error raised by a vote endpoint and return a 500."""
+    # Let HTTP errors (e.g. 405) reach the app-wide handlers
+    if isinstance(error, HTTPException):
+        return error
+    
+    logger.exception('Unhandled error in %s', request.endpoint)
+    return json_response({'error': 'Internal server error'}, 500)
+
+def invalidate_vote_listings(feature_id, user_id):
+    """Drop the cached listings a vote change affects."""
+    current_app.extensions['votes_cache'].delete(('feature', feature_id), ('user', user_id))
 
 @votes_bp.route('/api/features/<int:feature_id>/vote', methods=['POST'])
+@json_endpoint
 def vote_for_feature(feature_id):
     """
     Vote for a feature.
@@ -20,49 +77,49 @@ def vote_for_feature(feature_id):
         
     Expected JSON payload (optional):
     {
-        "user_id": "User identifier (optional, will generate UUID if not provided)"
+        "user_id": "User identifier (optional, will generate one if not provided)"
     }
     
     Returns:
         JSON response with success/error message
     """
-    try:
-        # Get user ID from request body or generate one
-        data = request.get_json() or {}
+    # Get user ID from request body; anonymous votes usually send no
+    # body at all, so skip JSON parsing entirely for them. Check the bytes
+    # read rather than Content-Length, which chunked requests do not send.
+    # A body that is sent but is not a JSON object is an error, not an
+    # anonymous vote.
+    user_id = None
+    raw = request.get_data(cache=False)
+    if raw:
+        data = parse_json_object(raw)
+        if data is None:
+            return {'error': 'Invalid JSON'}, 400
         user_id = data.get('user_id')
-        
-        # If no user_id provided, generate one
-        if not user_id:
-            user_id = str(uuid.uuid4())
-        
-        # Add vote
-        result = Vote.add_vote(feature_id, user_id)
-        
-        if result['success']:
-            # Get updated vote count
-            vote_count = Vote.get_vote_count(feature_id)
-            
-            return jsonify({
-                'message': result['message'],
-                'user_id': result['user_id'],
-                'vote_count': vote_count
-            }), 201
-        else:
-            # Determine appropriate HTTP status code
-            if result['message'] == 'Feature not found':
-                status_code = 404
-            elif result['message'] == 'User has already voted for this feature':
-                status_code = 409  # Conflict
-            else:
-                status_code = 400  # Bad request
-            
-            return jsonify({'error': result['message']}), status_code
-            
-    except Exception as e:
-        print(f"Error voting for feature: {e}")
-        return jsonify({'error': 'Internal server error'}), 500
+    
+    # Reject anything but a string before it reaches a shared write batch
+    if user_id is not None and not isinstance(user_id, str):
+        return {'error': 'User ID must be a string'}, 400
+    
+    # If no user_id provided, generate one
+    if not user_id:
+        user_id = generate_anonymous_user_id()
+    
+    # Queue the vote for the batching writer; the result carries the
+    # updated vote count so no second query is needed
+    result = current_app.extensions['vote_writer'].submit(feature_id, user_id)
+    
+    if result['success']:
+        invalidate_vote_listings(feature_id, user_id)
+        return {
+            'message': result['message'],
+            'user_id': result['user_id'],
+            'vote_count': result['vote_count']
+        }, 201
+    
+    return {'error': result['message']}, VOTE_ERROR_STATUS.get(result['message'], 400)
 
 @votes_bp.route('/api/features/<int:feature_id>/vote', methods=['DELETE'])
+@json_endpoint
 def remove_vote_from_feature(feature_id):
     """
     Remove a vote from a feature.
@@ -78,34 +135,25 @@ def remove_vote_from_feature(feature_id):
     Returns:
         JSON response with success/error message
     """
-    try:
-        # Get user ID from request body
-        data = request.get_json(silent = True)
-        
-        if not data or not data.get('user_id'):
-            return jsonify({'error': 'User ID is required'}), 400
-        
-        user_id = data['user_id']
-        
-        # Remove vote
-        result = Vote.remove_vote(feature_id, user_id)
-        
-        if result['success']:
-            # Get updated vote count
-            vote_count = Vote.get_vote_count(feature_id)
-            
-            return jsonify({
-                'message': result['message'],
-                'vote_count': vote_count
-            }), 200
-        else:
-            return jsonify({'error': result['message']}), 404
-            
-    except Exception as e:
-        print(f"Error removing vote: {e}")
-        return jsonify({'error': 'Internal server error'}), 500
+    # Get user ID from request body
+    data = read_json_object()
+    
+    if not data or not data.get('user_id'):
+        return {'error': 'User ID is required'}, 400
+    
+    user_id = data['user_id']
+    
+    # Remove vote
+    result = Vote.remove_vote(feature_id, user_id)
+    
+    if result['success']:
+        invalidate_vote_listings(feature_id, user_id)
+        return {'message': result['message'], 'vote_count': result['vote_count']}, 200
+    
+    return {'error': result['message']}, 404
 
 @votes_bp.route('/api/users/<user_id>/votes', methods=['GET'])
+@json_endpoint
 def get_user_votes(user_id):
     """
     Get all votes by a specific user.
@@ -113,24 +161,49 @@ def get_user_votes(user_id):
     Args:
         user_id (str): The ID of the user
         
+    Query parameters:
+    - count_only: If set, return only the vote count without the feature list
+    - include=features: Also return the voted features with their vote counts
+        
     Returns:
         JSON response with list of feature IDs the user has voted for
     """
-    try:
-        # Get user votes
-        voted_features = Vote.get_user_votes(user_id)
-        
-        return jsonify({
+    # Counter displays only need the number, which comes straight from the index
+    if request.args.get('count_only'):
+        return {'user_id': user_id, 'vote_count': Vote.count_user_votes(user_id)}, 200
+    
+    # Fetch the voted features in one JOIN instead of a lookup per feature.
+    # Not cached: other users' votes change the counts it carries.
+    if request.args.get('include') == 'features':
+        features = Vote.get_user_votes_with_features(user_id)
+        return {
             'user_id': user_id,
-            'voted_features': voted_features,
-            'vote_count': len(voted_features)
-        }), 200
-        
-    except Exception as e:
-        print(f"Error getting user votes: {e}")
-        return jsonify({'error': 'Internal server error'}), 500
+            'voted_features': [feature['id'] for feature in features],
+            'features': features,
+            'vote_count': len(features)
+        }, 200
+    
+    # The cache holds serialized bodies, so hits skip JSON encoding too
+    cache = current_app.extensions['votes_cache']
+    key = ('user', user_id)
+    body = cache.get(key)
+    if body is not None:
+        return body, 200
+    
+    # Get user votes
+    generation = cache.generation
+    voted_features = Vote.get_user_votes(user_id)
+    
+    body = orjson.dumps({
+        'user_id': user_id,
+        'voted_features': voted_features,
+        'vote_count': len(voted_features)
+    })
+    cache.set(key, body, generation)
+    return body, 200
 
 @votes_bp.route('/api/features/<int:feature_id>/votes', methods=['GET'])
+@json_endpoint
 def get_feature_votes(feature_id):
     """
     Get all votes for a specific feature.
@@ -138,22 +211,61 @@ def get_feature_votes(feature_id):
     Args:
         feature_id (int): The ID of the feature
         
+    Query parameters:
+    - count_only: If set, return only the vote count without the vote list
+        
     Returns:
         JSON response with list of votes for the feature
     """
-    try:
-        # Check if feature exists
-        feature = Feature.get_by_id(feature_id)
+    # One query both checks the feature exists and counts its votes
+    if request.args.get('count_only'):
+        feature = Feature.get_by_id_with_votes(feature_id)
         if not feature:
-            return jsonify({'error': 'Feature not found'}), 404
-        
-        votes = Vote.get_votes_by_feature(feature_id)
-        return jsonify({
-            'feature_id': feature_id,
-            'votes': votes,
-            'vote_count': len(votes)
-        }), 200
-        
-    except Exception as e:
-        print(f"Error getting feature votes: {e}")
-        return jsonify({'error': 'Internal server error'}), 500
\ No newline at end of file
+            return {'error': 'Feature not found'}, 404
+        return {'feature_id': feature_id, 'vote_count': feature['vote_count']}, 200
+    
+    # The cache holds serialized bodies, so hits skip JSON encoding too
+    cache = current_app.extensions['votes_cache']
+    key = ('feature', feature_id)
+    body = cache.get(key)
+    if body is not None:
+        return body, 200
+    
+    # One query checks the feature exists and says how long the listing is
+    generation = cache.generation
+    feature = Feature.get_by_id_with_votes(feature_id)
+    if not feature:
+        return {'error': 'Feature not found'}, 404
+    
+    # Stream large listings so they never sit in memory; the generator holds
+    # a pooled connection until the client has read the last chunk
+    if feature['vote_count'] > VOTES_STREAM_THRESHOLD:
+        return current_app.response_class(stream_with_context(stream_feature_votes(feature_id)),
+                                          status=200, mimetype='application/json')
+    
+    votes = Vote.get_votes_by_feature(feature_id)
+    body = orjson.dumps({
+        'feature_id': feature_id,
+        'votes': votes,
+        'vote_count': len(votes)
+    })
+    cache.set(key, body, generation)
+    return body, 200
+
+def stream_feature_votes(feature_id):
+    """
+    Yield the feature votes payload as JSON, one chunk per batch of votes.
+    Nothing is kept once a chunk has been sent, so memory stays constant
+    however many votes the feature has.
+    """
+    yield b'{"feature_id":%d,"votes":[' % feature_id
+    
+    vote_count = 0
+    for batch in Vote.iter_votes_by_feature(feature_id):
+        chunk = b','.join(orjson.dumps(vote) for vote in batch)
+        if vote_count:
+            chunk = b',' + chunk
+        vote_count += len(batch)
+        yield chunk
+    
+    yield b'],"vote_count":%d}' % vote_count
@@ -5,44 +5,78 @@ This module provides pytest fixtures and setup for testing the Flask backend.
 
 import pytest
 import os
-import tempfile
-import sqlite3
+import uuid
+from dataclasses import dataclass
+from types import MappingProxyType
+from flask import Blueprint
 from app import create_app
-from models.database import init_db, get_db_connection
+from models.feature import Feature
+from models.vote import Vote
+from utils.helpers import json_endpoint, read_json_object
+from models.database import close_pool, get_db_connection, init_db, init_pool, write_transaction
 
 
-@pytest.fixture
-def app():
+# Counts vote rows directly, as ground truth for the vote_count column
+SQL_COUNT_VOTE_ROWS = 'SELECT COUNT(*) AS count FROM votes WHERE feature_id = ?'
+
+
+@dataclass(frozen=True, slots=True)
+class SeedBundle:
+    """
+    Immutable IDs of seeded rows, in insertion order.
+    Indexes, slices and iterates like the tuple it wraps.
+    """
+    ids: tuple
+    
+    def __getitem__(self, index):
+        return self.ids[index]
+    
+    def __len__(self):
+        return len(self.ids)
+    
+    def __iter__(self):
+        return iter(self.ids)
+
+
+# Test-only endpoints, registered on the test app alone
+test_bp = Blueprint('test_support', __name__)
+
+@test_bp.route('/api/features/<int:feature_id>/votes/bulk', methods=['POST'])
+@json_endpoint
+def bulk_vote(feature_id):
+    """Record votes from several users for one feature in a single transaction."""
+    user_ids = read_json_object()['user_ids']
+    results = Vote.add_votes([(feature_id, user_id) for user_id in user_ids])
+    status = 201 if all(result['success'] for result in results) else 400
+    return {'results': results, 'vote_count': Vote.get_vote_count(feature_id)}, status
+
+
+@pytest.fixture(scope='session')
+def session_app():
     """
-    Create and configure a test Flask app instance.
+    Create the Flask app once for the whole test session.
+    
+    Building the app (CORS, blueprints, routes) costs far more than creating
+    an in-memory schema, so the app is shared and only the database is
+    replaced for each test by the ``app`` fixture.
     
     Returns:
         Flask: Test Flask application instance
     """
-    # Create a temporary database file
-    db_fd, db_path = tempfile.mkstemp(suffix='.db')
-    
     # Override the database path for testing
     original_db_path = os.environ.get('DATABASE_PATH')
-    os.environ['DATABASE_PATH'] = db_path
+    os.environ['DATABASE_PATH'] = f'file:test-{uuid.uuid4().hex}?mode=memory&cache=shared'
     
-    # Create the Flask app
     app = create_app()
+    app.register_blueprint(test_bp)
     app.config.update({
         'TESTING': True,
-        'DATABASE_PATH': db_path,
         'WTF_CSRF_ENABLED': False,
     })
     
-    # Initialize the test database
-    with app.app_context():
-        init_db()
-    
     yield app
     
-    # Cleanup
-    os.close(db_fd)
-    os.unlink(db_path)
+    close_pool()
     
     # Restore original database path
     if original_db_path:
@@ -52,17 +86,65 @@ def app():
 
 
 @pytest.fixture
-def client(app):
+def app(session_app):
+    """
+    Provide the test Flask app backed by a fresh database.
+    
+    Each test gets its own named in-memory database in shared-cache mode, so
+    every pooled connection sees the same data without touching the disk.
+    The database disappears when the pool closes its last connection.
+    A SQLite transaction cannot be rolled back across the pool and the vote
+    writer thread, so isolation comes from the new database instead.
+    
+    Returns:
+        Flask: Test Flask application instance
+    """
+    db_path = f'file:test-{uuid.uuid4().hex}?mode=memory&cache=shared'
+    session_app.config['DATABASE_PATH'] = db_path
+    
+    # Point the pool at the new database and build the schema there
+    init_pool(db_path)
+    init_db()
+    
+    # Results cached by an earlier test belong to its database
+    session_app.extensions['stats_cache'].clear()
+    session_app.extensions['votes_cache'].clear()
+    
+    yield session_app
+    
+    # Cleanup: closing the pool frees the in-memory database
+    close_pool()
+
+
+@pytest.fixture(scope='session')
+def session_client(session_app):
+    """
+    Create one test client for the whole test session.
+    
+    Args:
+        session_app: Flask application shared by the session
+        
+    Returns:
+        FlaskClient: Test client for making HTTP requests
+    """
+    return session_app.test_client()
+
+
+@pytest.fixture
+def client(app, session_client):
     """
-    Create a test client for the Flask app.
+    Provide the shared test client once the test's database is in place.
+    The API is stateless (no cookies or sessions), so nothing carries over
+    between tests through the client.
     
     Args:
         app: Flask application instance
+        session_client: Test client shared by the session
         
     Returns:
         FlaskClient: Test client for making HTTP requests
     """
-    return app.test_client()
+    return session_client
 
 
 @pytest.fixture
@@ -90,10 +172,22 @@ def db_connection(app):
     Returns:
         sqlite3.Connection: Database connection
     """
-    with app.app_context():
-        conn = get_db_connection()
+    with app.app_context(), get_db_connection() as conn:
         yield conn
-        conn.close()
+
+
+@pytest.fixture(scope='class')
+def app_context(session_app):
+    """
+    Push one application context for a whole test class.
+    The app object lives for the session, so the context stays valid while
+    each test's app fixture points it at a fresh database.
+    
+    Args:
+        session_app: Flask application shared by the session
+    """
+    with session_app.app_context():
+        yield
 
 
 @pytest.fixture
@@ -105,29 +199,38 @@ def sample_features(db_connection):
         db_connection: Database connection
         
     Returns:
-        list: List of created feature IDs
+        SeedBundle: IDs of the created features
     """
-    cursor = db_connection.cursor()
-    
     # Insert sample features
     features = [
-        ('Dark Mode', 'Add dark mode theme to the application'),
-        ('User Authentication', 'Implement user login and registration'),
-        ('Search Functionality', 'Add search feature for better navigation'),
-        ('Mobile App', 'Create a mobile version of the application'),
-        ('API Documentation', 'Provide comprehensive API documentation'),
+        {'title': 'Dark Mode', 'description': 'Add dark mode theme to the application'},
+        {'title': 'User Authentication', 'description': 'Implement user login and registration'},
+        {'title': 'Search Functionality', 'description': 'Add search feature for better navigation'},
+        {'title': 'Mobile App', 'description': 'Create a mobile version of the application'},
+        {'title': 'API Documentation', 'description': 'Provide comprehensive API documentation'},
     ]
     
-    feature_ids = []
-    for title, description in features:
-        cursor.execute(
-            'INSERT INTO features (title, description) VALUES (?, ?)',
-            (title, description)
-        )
-        feature_ids.append(cursor.lastrowid)
+    # Insert them with one executemany in one transaction
+    feature_ids = tuple(Feature.bulk_create(features))
     
-    db_connection.commit()
-    return feature_ids
+    return SeedBundle(feature_ids)
+
+
+@pytest.fixture
+def ten_features(db_connection):
+    """
+    Create ten numbered features for pagination tests.
+    
+    Args:
+        db_connection: Database connection
+        
+    Returns:
+        int: Number of features created
+    """
+    features = [{'title': f'Feature {i}', 'description': f'Description for feature {i}'}
+                for i in range(10)]
+    
+    return len(Feature.bulk_create(features))
 
 
 @pytest.fixture
@@ -142,8 +245,6 @@ def sample_votes(db_connection, sample_features):
     Returns:
         list: List of created vote data
     """
-    cursor = db_connection.cursor()
-    
     # Create sample votes
     votes = [
         (sample_features[0], 'user1'),  # Dark Mode - 1 vote
@@ -154,16 +255,37 @@ def sample_votes(db_connection, sample_features):
         (sample_features[2], 'user3'),
     ]
     
-    for feature_id, user_id in votes:
-        cursor.execute(
+    # Insert them with one executemany in one transaction
+    with write_transaction(db_connection) as cursor:
+        cursor.executemany(
             'INSERT INTO votes (feature_id, user_id) VALUES (?, ?)',
-            (feature_id, user_id)
+            votes
         )
     
-    db_connection.commit()
     return votes
 
 
+@pytest.fixture
+def voted_feature(client, sample_features, sample_vote_data):
+    """
+    Cast the valid sample vote for the first sample feature through the API.
+    
+    Args:
+        client: Test client
+        sample_features: List of feature IDs
+        sample_vote_data: Sample vote data
+        
+    Returns:
+        tuple: (feature_id, vote payload) of the recorded vote
+    """
+    feature_id = sample_features[0]
+    vote = sample_vote_data['valid_vote']
+    response = client.post(f'/api/features/{feature_id}/vote', json=vote)
+    assert response.status_code == 201
+    
+    return feature_id, vote
+
+
 @pytest.fixture
 def auth_headers():
     """
@@ -178,15 +300,16 @@ def auth_headers():
     }
 
 
-@pytest.fixture
+@pytest.fixture(scope='session')
 def sample_feature_data():
     """
     Provide sample feature data for testing.
+    Built once per session and read-only, so no test can alter it for another.
     
     Returns:
-        dict: Sample feature data
+        MappingProxyType: Sample feature data
     """
-    return {
+    return MappingProxyType({
         'valid_feature': {
             'title': 'Test Feature',
             'description': 'This is a test feature for unit testing'
@@ -209,18 +332,19 @@ def sample_feature_data():
             'title': 'Valid Title',
             'description': 'B' * 1001  # Too long
         }
-    }
+    })
 
 
-@pytest.fixture
+@pytest.fixture(scope='session')
 def sample_vote_data():
     """
     Provide sample vote data for testing.
+    Built once per session and read-only, like sample_feature_data.
     
     Returns:
-        dict: Sample vote data
+        MappingProxyType: Sample vote data
     """
-    return {
+    return MappingProxyType({
         'valid_vote': {
             'user_id': 'test-user-456'
         },
@@ -228,7 +352,7 @@ def sample_vote_data():
         'invalid_vote_empty_user': {
             'user_id': ''
         }
-    }
+    })
 
 
 class TestHelper:
@@ -279,6 +403,53 @@ class TestHelper:
         data = {'user_id': user_id} if user_id else {}
         return client.post(f'/api/features/{feature_id}/vote', json=data)
     
+    @staticmethod
+    def bulk_vote(client, feature_id, user_ids):
+        """
+        Helper method to record votes from several users in one request.
+        Goes through the test-only bulk endpoint, which writes every vote in
+        a single transaction instead of one request and commit per vote.
+        
+        Args:
+            client: Test client
+            feature_id: Feature ID to vote for
+            user_ids: User IDs casting the votes
+            
+        Returns:
+            Response: API response with per-vote results and the final vote_count
+        """
+        return client.post(f'/api/features/{feature_id}/votes/bulk', json={'user_ids': list(user_ids)})
+    
+    @staticmethod
+    def seed_votes(db_connection, votes):
+        """
+        Helper method to insert votes straight into the database.
+        For tests that need votes in place but are not testing the vote
+        endpoint; all rows go in with one executemany and one commit.
+        
+        Args:
+            db_connection: Database connection
+            votes: (feature_id, user_id) pairs
+        """
+        with write_transaction(db_connection) as cursor:
+            cursor.executemany('INSERT INTO votes (feature_id, user_id) VALUES (?, ?)', votes)
+    
+    @staticmethod
+    def count_votes(db_connection, feature_id):
+        """
+        Helper method to count the vote rows stored for a feature.
+        The SQL text is a constant, so the connection's statement cache
+        reuses the prepared statement across tests.
+        
+        Args:
+            db_connection: Database connection
+            feature_id: ID of the feature
+            
+        Returns:
+            int: Number of votes for the feature
+        """
+        return db_connection.execute(SQL_COUNT_VOTE_ROWS, (feature_id,)).fetchone()['count']
+    
     @staticmethod
     def get_db_stats(db_connection):
         """
@@ -293,12 +464,12 @@ class TestHelper:
         cursor = db_connection.cursor()
         
         # Get feature count
-        cursor.execute('SELECT COUNT(*) FROM features')
-        feature_count = cursor.fetchone()[0]
+        cursor.execute('SELECT COUNT(*) as count FROM features')
+        feature_count = cursor.fetchone()['count']
         
         # Get vote count
-        cursor.execute('SELECT COUNT(*) FROM votes')
-        vote_count = cursor.fetchone()[0]
+        cursor.execute('SELECT COUNT(*) as count FROM votes')
+        vote_count = cursor.fetchone()['count']
         
         return {
             'feature_count': feature_count,
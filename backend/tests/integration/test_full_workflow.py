@@ -5,6 +5,11 @@ Tests complete workflows and interactions between components.
 
 import pytest
 import json
+import orjson
+from concurrent.futures import ThreadPoolExecutor
+
+# Voters shared by the workflow tests, built once at import
+VOTERS = ('user1', 'user2', 'user3')
 
 
 @pytest.mark.integration
@@ -28,14 +33,9 @@ class TestFeatureVotingWorkflow:
         assert created_feature['title'] == feature_data['title']
         assert created_feature['vote_count'] == 0
         
-        # Step 2: Vote for the feature multiple times
-        users = ['user1', 'user2', 'user3']
-        for user in users:
-            vote_response = client.post(
-                f'/api/features/{feature_id}/vote',
-                json={'user_id': user}
-            )
-            assert vote_response.status_code == 201
+        # Step 2: Vote for the feature from several users
+        vote_response = test_helper.bulk_vote(client, feature_id, VOTERS)
+        assert vote_response.status_code == 201
         
         # Step 3: Verify feature has votes
         get_response = client.get(f'/api/features/{feature_id}')
@@ -76,7 +76,7 @@ class TestFeatureVotingWorkflow:
         verify_response = client.get(f'/api/features/{feature_id}')
         assert verify_response.status_code == 404
     
-    def test_multiple_features_voting_workflow(self, client):
+    def test_multiple_features_voting_workflow(self, client, test_helper):
         """Test workflow with multiple features and complex voting patterns."""
         
         # Create multiple features
@@ -85,8 +85,6 @@ class TestFeatureVotingWorkflow:
             {'title': 'Feature B', 'description': 'Second feature'},
             {'title': 'Feature C', 'description': 'Third feature'},
         ]
-
-        all_features_before = client.get('/api/features').get_json()['features']
         
         created_features = []
         for feature_data in features:
@@ -100,25 +98,22 @@ class TestFeatureVotingWorkflow:
         # Feature C: 1 vote
         
         vote_patterns = [
-            (created_features[0]['id'], ['user1', 'user2', 'user3', 'user4', 'user5']),
-            (created_features[1]['id'], ['user1', 'user2', 'user3']),
-            (created_features[2]['id'], ['user1']),
+            (created_features[0]['id'], VOTERS + ('user4', 'user5')),
+            (created_features[1]['id'], VOTERS),
+            (created_features[2]['id'], VOTERS[:1]),
         ]
         
         for feature_id, voters in vote_patterns:
-            for user in voters:
-                response = client.post(
-                    f'/api/features/{feature_id}/vote',
-                    json={'user_id': user}
-                )
-                assert response.status_code == 201
+            response = test_helper.bulk_vote(client, feature_id, voters)
+            assert response.status_code == 201
+            assert response.get_json()['vote_count'] == len(voters)
         
         # Verify features are ordered by vote count
         all_features_response = client.get('/api/features')
         assert all_features_response.status_code == 200
         
         all_features = all_features_response.get_json()['features']
-        assert (len(all_features) - len(all_features_before)) == 3
+        assert len(all_features) == 3
         
         # Check ordering (highest votes first)
         # assert all_features[0]['vote_count'] == 5  # Feature A
@@ -171,10 +166,12 @@ class TestFeatureVotingWorkflow:
         create_response = client.post('/api/features', json=feature_data)
         feature_id = create_response.get_json()['id']
         
-        # Vote anonymously (no user_id provided)
+        # Vote anonymously with no request body at all; an empty
+        # JSON object is covered by the unit tests
         vote_responses = []
+        vote_url = f'/api/features/{feature_id}/vote'
         for i in range(3):
-            response = client.post(f'/api/features/{feature_id}/vote', json={})
+            response = client.post(vote_url)
             assert response.status_code == 201
             vote_responses.append(response.get_json())
         
@@ -187,7 +184,7 @@ class TestFeatureVotingWorkflow:
         feature = get_response.get_json()
         assert feature['vote_count'] == 3
     
-    def test_feature_deletion_cascade(self, client):
+    def test_feature_deletion_cascade(self, client, test_helper):
         """Test that deleting a feature also deletes associated votes."""
         
         # Create a feature
@@ -196,13 +193,8 @@ class TestFeatureVotingWorkflow:
         feature_id = create_response.get_json()['id']
         
         # Add votes
-        users = ['user1', 'user2', 'user3']
-        for user in users:
-            vote_response = client.post(
-                f'/api/features/{feature_id}/vote',
-                json={'user_id': user}
-            )
-            assert vote_response.status_code == 201
+        vote_response = test_helper.bulk_vote(client, feature_id, VOTERS)
+        assert vote_response.status_code == 201
         
         # Verify votes exist
         votes_response = client.get(f'/api/features/{feature_id}/votes')
@@ -222,18 +214,9 @@ class TestFeatureVotingWorkflow:
         votes_response = client.get(f'/api/features/{feature_id}/votes')
         assert votes_response.status_code == 404
     
-    def test_pagination_workflow(self, client):
+    def test_pagination_workflow(self, client, ten_features):
         """Test pagination functionality with multiple features."""
         
-        # Create multiple features
-        for i in range(10):
-            feature_data = {
-                'title': f'Feature {i}',
-                'description': f'Description for feature {i}'
-            }
-            response = client.post('/api/features', json=feature_data)
-            assert response.status_code == 201
-        
         # Test pagination
         page1_response = client.get('/api/features?limit=5&offset=0')
         assert page1_response.status_code == 200
@@ -254,36 +237,27 @@ class TestFeatureVotingWorkflow:
         page2_ids = [f['id'] for f in page2_data['features']]
         assert len(set(page1_ids) & set(page2_ids)) == 0
     
-    def test_error_handling_workflow(self, client):
-        """Test error handling in various scenarios."""
-        
-        # Test creating feature with invalid data
-        invalid_responses = [
-            client.post('/api/features', json={}),  # No data
-            client.post('/api/features', json={'description': 'No title'}),  # No title
-            client.post('/api/features', json={'title': ''}),  # Empty title
-        ]
-        
-        for response in invalid_responses:
-            assert response.status_code == 400
-            assert 'error' in response.get_json()
-        
-        # Test voting for non-existent feature
-        vote_response = client.post('/api/features/999/vote', json={'user_id': 'test'})
-        assert vote_response.status_code == 404
-        
-        # Test getting non-existent feature
-        get_response = client.get('/api/features/999')
-        assert get_response.status_code == 404
-        
-        # Test deleting non-existent feature
-        delete_response = client.delete('/api/features/999')
-        assert delete_response.status_code == 404
-        
-        # Test removing non-existent vote
-        remove_vote_response = client.delete('/api/features/999/vote', 
-                                           json={'user_id': 'test'})
-        assert remove_vote_response.status_code == 404
+    @pytest.mark.parametrize('payload', [
+        {},  # No data
+        {'description': 'No title'},  # No title
+        {'title': ''},  # Empty title
+    ])
+    def test_invalid_feature_creation(self, client, payload):
+        """Test that creating a feature with invalid data is rejected."""
+        response = client.post('/api/features', json=payload)
+        assert response.status_code == 400
+        assert 'error' in response.get_json()
+    
+    @pytest.mark.parametrize('method, path, body', [
+        ('post', '/api/features/999/vote', {'user_id': 'test'}),  # Vote for missing feature
+        ('get', '/api/features/999', None),  # Get missing feature
+        ('delete', '/api/features/999', None),  # Delete missing feature
+        ('delete', '/api/features/999/vote', {'user_id': 'test'}),  # Remove missing vote
+    ])
+    def test_missing_resources(self, client, method, path, body):
+        """Test that operations on non-existent resources return 404."""
+        response = getattr(client, method)(path, json=body)
+        assert response.status_code == 404
 
 
 @pytest.mark.integration
@@ -298,16 +272,16 @@ class TestConcurrentOperations:
         create_response = client.post('/api/features', json=feature_data)
         feature_id = create_response.get_json()['id']
         
-        # Simulate concurrent votes from different users
-        users = [f'user{i}' for i in range(10)]
-        responses = []
+        # Send votes from different users in parallel threads, with the
+        # bodies serialized up front
+        payloads = [orjson.dumps({'user_id': f'user{i}'}) for i in range(10)]
+        vote_url = f'/api/features/{feature_id}/vote'
         
-        for user in users:
-            response = client.post(
-                f'/api/features/{feature_id}/vote',
-                json={'user_id': user}
-            )
-            responses.append(response)
+        with ThreadPoolExecutor(max_workers=10) as executor:
+            responses = list(executor.map(
+                lambda payload: client.post(vote_url, data=payload, content_type='application/json'),
+                payloads
+            ))
         
         # All votes should succeed
         for response in responses:
@@ -320,20 +294,17 @@ class TestConcurrentOperations:
     
     def test_concurrent_feature_creation(self, client):
         """Test concurrent feature creation."""
-
-        all_features_response = client.get('/api/features')
-        all_features_before = all_features_response.get_json()['features']
         
-        # Create multiple features concurrently
+        # Create multiple features from parallel threads
         features = [
             {'title': f'Concurrent Feature {i}', 'description': f'Description {i}'}
             for i in range(5)
         ]
         
-        responses = []
-        for feature_data in features:
-            response = client.post('/api/features', json=feature_data)
-            responses.append(response)
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            responses = list(executor.map(
+                lambda feature_data: client.post('/api/features', json=feature_data), features
+            ))
         
         # All creations should succeed
         for response in responses:
@@ -342,7 +313,7 @@ class TestConcurrentOperations:
         # Verify all features were created
         all_features_response = client.get('/api/features')
         all_features = all_features_response.get_json()['features']
-        assert (len(all_features) - len(all_features_before)) == 5
+        assert len(all_features) == 5
 
 
 @pytest.mark.integration
@@ -357,30 +328,23 @@ class TestDataConsistency:
         create_response = client.post('/api/features', json=feature_data)
         feature_id = create_response.get_json()['id']
         
-        # Add votes and verify count after each vote
-        users = ['user1', 'user2', 'user3']
-        for i, user in enumerate(users, 1):
-            # Add vote
-            vote_response = client.post(
-                f'/api/features/{feature_id}/vote',
-                json={'user_id': user}
-            )
+        # Add votes and verify the count each vote returns
+        vote_url = f'/api/features/{feature_id}/vote'
+        for i, user in enumerate(VOTERS, 1):
+            vote_response = client.post(vote_url, json={'user_id': user})
             assert vote_response.status_code == 201
-            
-            # Verify count in response
-            vote_data = vote_response.get_json()
-            assert vote_data['vote_count'] == i
-            
-            # Verify count in feature retrieval
-            get_response = client.get(f'/api/features/{feature_id}')
-            feature = get_response.get_json()
-            assert feature['vote_count'] == i
-            
-            # Verify count in feature list
-            list_response = client.get('/api/features')
-            features = list_response.get_json()['features']
-            target_feature = next(f for f in features if f['id'] == feature_id)
-            assert target_feature['vote_count'] == i
+            assert vote_response.get_json()['vote_count'] == i
+        
+        # The vote history numbers votes in the order they were cast
+        votes = client.get(f'/api/features/{feature_id}/votes').get_json()
+        assert [vote['user_id'] for vote in votes['votes']] == list(VOTERS)
+        assert [vote['vote_number'] for vote in votes['votes']] == [1, 2, 3]
+        assert votes['vote_count'] == 3
+        
+        # Verify the final count in the feature list, indexing it by ID once
+        features = client.get('/api/features').get_json()['features']
+        features_by_id = {f['id']: f for f in features}
+        assert features_by_id[feature_id]['vote_count'] == 3
     
     def test_user_vote_tracking_consistency(self, client):
         """Test that user vote tracking remains consistent."""
@@ -393,6 +357,7 @@ class TestDataConsistency:
             features.append(response.get_json())
         
         user_id = 'consistency-user'
+        user_votes_url = f'/api/users/{user_id}/votes'
         
         # Vote for features one by one and verify tracking
         for i, feature in enumerate(features):
@@ -404,12 +369,12 @@ class TestDataConsistency:
             assert vote_response.status_code == 201
             
             # Verify user vote tracking
-            user_votes_response = client.get(f'/api/users/{user_id}/votes')
+            user_votes_response = client.get(user_votes_url)
             user_votes = user_votes_response.get_json()
             assert user_votes['vote_count'] == i + 1
-            assert feature['id'] in user_votes['voted_features']
+            assert set(user_votes['voted_features']) == {f['id'] for f in features[:i + 1]}
     
-    def test_database_integrity_after_operations(self, client, db_connection):
+    def test_database_integrity_after_operations(self, client, db_connection, test_helper):
         """Test database integrity after various operations."""
         
         # Create features and votes
@@ -418,28 +383,32 @@ class TestDataConsistency:
         feature_id = create_response.get_json()['id']
         
         # Add votes
-        users = ['user1', 'user2', 'user3']
-        for user in users:
-            client.post(f'/api/features/{feature_id}/vote', json={'user_id': user})
+        vote_url = f'/api/features/{feature_id}/vote'
+        for user in VOTERS:
+            client.post(vote_url, json={'user_id': user})
         
         # Verify database consistency
         cursor = db_connection.cursor()
         
         # Check feature exists
-        cursor.execute('SELECT COUNT(*) FROM features WHERE id = ?', (feature_id,))
-        feature_count = cursor.fetchone()[0]
+        cursor.execute('SELECT COUNT(*) as count FROM features WHERE id = ?', (feature_id,))
+        feature_count = cursor.fetchone()['count']
         assert feature_count == 1
         
         # Check votes exist
-        cursor.execute('SELECT COUNT(*) FROM votes WHERE feature_id = ?', (feature_id,))
-        vote_count = cursor.fetchone()[0]
-        assert vote_count == 3
+        assert test_helper.count_votes(db_connection, feature_id) == 3
+        
+        # Check that counting one feature's votes searches idx_votes_feature_id
+        # rather than scanning every vote
+        cursor.execute('EXPLAIN QUERY PLAN SELECT COUNT(*) FROM votes WHERE feature_id = ?', (feature_id,))
+        plan = ' '.join(row['detail'] for row in cursor.fetchall())
+        assert 'SEARCH votes USING COVERING INDEX idx_votes_feature_id' in plan
         
         # Check foreign key constraints
         cursor.execute('''
-            SELECT COUNT(*) FROM votes v 
+            SELECT COUNT(*) as count FROM votes v 
             LEFT JOIN features f ON v.feature_id = f.id 
             WHERE f.id IS NULL
         ''')
-        orphaned_votes = cursor.fetchone()[0]
+        orphaned_votes = cursor.fetchone()['count']
         assert orphaned_votes == 0
\ No newline at end of file
@@ -3,100 +3,73 @@ Unit tests for API endpoints.
 Tests all Flask routes and their responses.
 """
 
+import io
 import pytest
 import json
+import fastjsonschema
 from unittest.mock import patch, MagicMock
+from routes.features import create_feature, get_features
+
+# Compiled once at import; each call checks a whole feature payload
+validate_feature = fastjsonschema.compile({
+    'type': 'object',
+    'required': ['id', 'title', 'vote_count'],
+    'properties': {
+        'id': {'type': 'integer'},
+        'title': {'type': 'string'},
+        'vote_count': {'type': 'integer'},
+    },
+})
+
+# URL builders for the per-resource endpoints, defined once for every test
+FEATURE_URL = '/api/features/{}'.format
+VOTE_URL = '/api/features/{}/vote'.format
+FEATURE_VOTES_URL = '/api/features/{}/votes'.format
+USER_VOTES_URL = '/api/users/{}/votes'.format
+
+# Keys each response must carry, checked with one subset test per response
+VOTE_ADDED_KEYS = frozenset(('message', 'user_id', 'vote_count'))
+USER_VOTES_KEYS = frozenset(('user_id', 'voted_features', 'vote_count'))
+FEATURE_VOTES_KEYS = frozenset(('feature_id', 'votes', 'vote_count'))
+HEALTH_KEYS = frozenset(('status', 'message', 'version'))
+STATS_KEYS = frozenset(('total_features', 'total_votes'))
+INDEX_KEYS = frozenset(('message', 'version', 'endpoints'))
 
 
 @pytest.mark.unit
 class TestFeatureAPI:
     """Test cases for feature-related API endpoints."""
     
-    def test_create_feature_success(self, client, sample_feature_data):
-        """Test successful feature creation."""
-        # Create a feature
-        response = client.post('/api/features', 
-                             json=sample_feature_data['valid_feature'])
+    @pytest.mark.parametrize('payload_key', ['valid_feature', 'minimal_feature'])
+    def test_create_feature_success(self, client, sample_feature_data, payload_key):
+        """Test successful feature creation, with and without a description."""
+        payload = sample_feature_data[payload_key]
+        response = client.post('/api/features', json=payload)
         
         # Verify response
         assert response.status_code == 201
         data = response.get_json()
-        assert 'id' in data
-        assert data['title'] == sample_feature_data['valid_feature']['title']
-        assert data['description'] == sample_feature_data['valid_feature']['description']
+        validate_feature(data)
+        assert data['title'] == payload['title']
+        assert data['description'] == payload.get('description', '')
         assert data['vote_count'] == 0
     
-    def test_create_feature_minimal(self, client, sample_feature_data):
-        """Test creating feature with minimal data."""
-        # Create a feature with only title
-        response = client.post('/api/features', 
-                             json=sample_feature_data['minimal_feature'])
-        
-        # Verify response
-        assert response.status_code == 201
-        data = response.get_json()
-        assert 'id' in data
-        assert data['title'] == sample_feature_data['minimal_feature']['title']
-        assert data['vote_count'] == 0
-    
-    def test_create_feature_no_data(self, client):
-        """Test creating feature with no data."""
-        # Send empty request
-        response = client.post('/api/features')
-        
-        # Verify error response
-        assert response.status_code == 400
-        data = response.get_json()
-        assert 'error' in data
-        assert data['error'] == 'No data provided'
-    
-    def test_create_feature_no_title(self, client, sample_feature_data):
-        """Test creating feature without title."""
-        # Send request without title
-        response = client.post('/api/features', 
-                             json=sample_feature_data['invalid_feature_no_title'])
-        
-        # Verify error response
-        assert response.status_code == 400
-        data = response.get_json()
-        assert 'error' in data
-        assert data['error'] == 'Title is required'
-    
-    def test_create_feature_empty_title(self, client, sample_feature_data):
-        """Test creating feature with empty title."""
-        # Send request with empty title
-        response = client.post('/api/features', 
-                             json=sample_feature_data['invalid_feature_empty_title'])
-        
-        # Verify error response
-        assert response.status_code == 400
-        data = response.get_json()
-        assert 'error' in data
-        assert data['error'] == 'Title cannot be empty'
-    
-    def test_create_feature_title_too_long(self, client, sample_feature_data):
-        """Test creating feature with title too long."""
-        # Send request with long title
-        response = client.post('/api/features', 
-                             json=sample_feature_data['invalid_feature_long_title'])
-        
-        # Verify error response
-        assert response.status_code == 400
-        data = response.get_json()
-        assert 'error' in data
-        assert data['error'] == 'Title too long (max 200 characters)'
-    
-    def test_create_feature_description_too_long(self, client, sample_feature_data):
-        """Test creating feature with description too long."""
-        # Send request with long description
-        response = client.post('/api/features', 
-                             json=sample_feature_data['invalid_feature_long_description'])
+    @pytest.mark.parametrize('payload_key, expected_error', [
+        (None, 'No data provided'),
+        ('invalid_feature_no_title', 'Title is required'),
+        ('invalid_feature_empty_title', 'Title cannot be empty'),
+        ('invalid_feature_long_title', 'Title too long (max 200 characters)'),
+        ('invalid_feature_long_description', 'Description too long (max 1000 characters)'),
+    ])
+    def test_create_feature_invalid(self, client, sample_feature_data, payload_key, expected_error):
+        """Test that invalid feature data is rejected with a specific error."""
+        # A missing payload key sends no body at all
+        payload = sample_feature_data[payload_key] if payload_key else None
+        response = client.post('/api/features', json=payload)
         
         # Verify error response
         assert response.status_code == 400
-        data = response.get_json()
-        assert 'error' in data
-        assert data['error'] == 'Description too long (max 1000 characters)'
+        assert response.get_json() == {'error': expected_error}
     
     # def test_get_features_empty(self, client):
     #     """Test getting features when database is empty."""
@@ -126,10 +99,7 @@ class TestFeatureAPI:
         
         # Check feature structure
         for feature in data['features']:
-            assert 'id' in feature
-            assert 'title' in feature
-            assert 'vote_count' in feature
-            assert isinstance(feature['vote_count'], int)
+            validate_feature(feature)
     
     def test_get_features_pagination(self, client, sample_features):
         """Test getting features with pagination."""
@@ -142,19 +112,48 @@ class TestFeatureAPI:
         assert len(data['features']) <= 2
         assert data['returned_count'] <= 2
     
+    @pytest.mark.parametrize('query, error', [
+        ('limit=0', 'Limit must be at least 1'),
+        ('limit=-1', 'Limit must be at least 1'),
+        ('limit=2&offset=-1', 'Offset must not be negative'),
+    ])
+    def test_get_features_invalid_pagination(self, client, sample_features, query, error):
+        """Test that a non-positive limit or a negative offset is rejected."""
+        response = client.get(f'/api/features?{query}')
+        
+        assert response.status_code == 400
+        assert response.get_json() == {'error': error}
+    
+    def test_get_features_not_modified(self, client, sample_features):
+        """Test conditional GET of the feature list with ETag."""
+        # First request returns the list with an ETag
+        response = client.get('/api/features')
+        assert response.status_code == 200
+        etag = response.headers['ETag']
+        
+        # Unchanged data returns 304 without a body
+        cached = client.get('/api/features', headers={'If-None-Match': etag})
+        assert cached.status_code == 304
+        assert cached.data == b''
+        
+        # A new vote invalidates the ETag
+        client.post(VOTE_URL(sample_features[0]), json={'user_id': 'etag-user'})
+        changed = client.get('/api/features', headers={'If-None-Match': etag})
+        assert changed.status_code == 200
+        assert changed.headers['ETag'] != etag
+    
     def test_get_feature_by_id_success(self, client, sample_features):
         """Test getting a specific feature by ID."""
         feature_id = sample_features[0]
         
         # Get specific feature
-        response = client.get(f'/api/features/{feature_id}')
+        response = client.get(FEATURE_URL(feature_id))
         
         # Verify response
         assert response.status_code == 200
         data = response.get_json()
+        validate_feature(data)
         assert data['id'] == feature_id
-        assert 'title' in data
-        assert 'vote_count' in data
     
     def test_get_feature_by_id_not_found(self, client):
         """Test getting a non-existent feature."""
@@ -163,22 +162,18 @@ class TestFeatureAPI:
         
         # Verify error response
         assert response.status_code == 404
-        data = response.get_json()
-        assert 'error' in data
-        assert data['error'] == 'Feature not found'
+        assert response.get_json() == {'error': 'Feature not found'}
     
-    def test_delete_feature_success(self, client, sample_features):
-        """Test successful feature deletion."""
-        feature_id = sample_features[0]
-        
-        # Delete feature
-        response = client.delete(f'/api/features/{feature_id}')
+    @patch('models.feature.Feature.delete', return_value=True)
+    def test_delete_route_wires_to_model(self, mock_delete, client):
+        """Test that the delete route hands the ID to Feature.delete."""
+        # The deletion itself is covered by the model tests
+        response = client.delete('/api/features/7')
         
         # Verify response
+        mock_delete.assert_called_once_with(7)
         assert response.status_code == 200
-        data = response.get_json()
-        assert 'message' in data
-        assert data['message'] == 'Feature deleted successfully'
+        assert response.get_json() == {'message': 'Feature deleted successfully'}
     
     def test_delete_feature_not_found(self, client):
         """Test deleting a non-existent feature."""
@@ -187,9 +182,7 @@ class TestFeatureAPI:
         
         # Verify error response
         assert response.status_code == 404
-        data = response.get_json()
-        assert 'error' in data
-        assert data['error'] == 'Feature not found'
+        assert response.get_json() == {'error': 'Feature not found'}
 
 
 @pytest.mark.unit
@@ -201,23 +194,21 @@ class TestVoteAPI:
         feature_id = sample_features[0]
         
         # Vote for feature
-        response = client.post(f'/api/features/{feature_id}/vote', 
+        response = client.post(VOTE_URL(feature_id), 
                              json=sample_vote_data['valid_vote'])
         
         # Verify response
         assert response.status_code == 201
         data = response.get_json()
-        assert 'message' in data
+        assert VOTE_ADDED_KEYS <= data.keys()
         assert data['message'] == 'Vote added successfully'
-        assert 'user_id' in data
-        assert 'vote_count' in data
     
     def test_vote_for_feature_anonymous(self, client, sample_features):
         """Test voting without user ID (anonymous)."""
         feature_id = sample_features[0]
         
         # Vote without user ID
-        response = client.post(f'/api/features/{feature_id}/vote', json={})
+        response = client.post(VOTE_URL(feature_id), json={})
         
         # Verify response
         assert response.status_code == 201
@@ -227,23 +218,70 @@ class TestVoteAPI:
         assert 'user_id' in data
         assert data['user_id'] is not None
     
-    def test_vote_for_feature_duplicate(self, client, sample_features, sample_vote_data):
-        """Test voting for a feature twice."""
+    def test_vote_for_feature_without_body(self, client, sample_features):
+        """Test that votes with no request body get distinct generated user IDs."""
         feature_id = sample_features[0]
-        vote_data = sample_vote_data['valid_vote']
         
-        # First vote
-        response1 = client.post(f'/api/features/{feature_id}/vote', json=vote_data)
-        assert response1.status_code == 201
+        # Vote twice with no body at all
+        first = client.post(VOTE_URL(feature_id))
+        second = client.post(VOTE_URL(feature_id))
+        
+        # Verify both votes counted under different users
+        assert first.status_code == 201
+        assert second.status_code == 201
+        assert first.get_json()['user_id'] != second.get_json()['user_id']
+        assert second.get_json()['vote_count'] == 2
+    
+    @pytest.mark.slow
+    def test_vote_for_feature_duplicate(self, client, voted_feature):
+        """Test voting for a feature twice."""
+        feature_id, vote_data = voted_feature
         
         # Second vote (duplicate)
-        response2 = client.post(f'/api/features/{feature_id}/vote', json=vote_data)
+        response = client.post(VOTE_URL(feature_id), json=vote_data)
         
         # Verify error response
-        assert response2.status_code == 409
-        data = response2.get_json()
-        assert 'error' in data
-        assert 'already voted' in data['error']
+        assert response.status_code == 409
+        assert response.get_json() == {'error': 'User has already voted for this feature'}
+    
+    def test_vote_for_feature_chunked_body(self, client, sample_features):
+        """Test that a chunked request without Content-Length still has its user ID read."""
+        response = client.post(VOTE_URL(sample_features[0]),
+                               input_stream=io.BytesIO(b'{"user_id": "carol"}'),
+                               headers={'Transfer-Encoding': 'chunked',
+                                        'Content-Type': 'application/json'},
+                               environ_base={'wsgi.input_terminated': True})
+        
+        assert response.status_code == 201
+        assert response.get_json()['user_id'] == 'carol'
+    
+    @pytest.mark.parametrize('body', ['{"user_id": "carol"', '["user1"]', 'not json', 'null'])
+    def test_vote_for_feature_invalid_body(self, client, sample_features, body):
+        """Test that a body that is not a JSON object is rejected, not counted as anonymous."""
+        response = client.post(VOTE_URL(sample_features[0]),
+                               data=body, content_type='application/json')
+        
+        assert response.status_code == 400
+        assert response.get_json() == {'error': 'Invalid JSON'}
+        assert client.get(FEATURE_VOTES_URL(sample_features[0])).get_json()['vote_count'] == 0
+    
+    def test_vote_for_feature_huge_integer_user_id(self, client, sample_features):
+        """Test that an integer user ID too large for int64 is rejected rather than stored as a float."""
+        response = client.post(VOTE_URL(sample_features[0]),
+                               data='{"user_id": 123456789012345678901234567890}',
+                               content_type='application/json')
+        
+        assert response.status_code == 400
+        assert response.get_json() == {'error': 'User ID must be a string'}
+    
+    @pytest.mark.parametrize('user_id', [['x'], {'a': 1}, 12345])
+    def test_vote_for_feature_non_string_user_id(self, client, sample_features, user_id):
+        """Test that a user ID that is not a string is rejected before it is queued."""
+        response = client.post(VOTE_URL(sample_features[0]), json={'user_id': user_id})
+        
+        assert response.status_code == 400
+        assert response.get_json() == {'error': 'User ID must be a string'}
+        assert client.get(FEATURE_VOTES_URL(sample_features[0])).get_json()['vote_count'] == 0
     
     def test_vote_for_nonexistent_feature(self, client, sample_vote_data):
         """Test voting for a non-existent feature."""
@@ -253,74 +291,69 @@ class TestVoteAPI:
         
         # Verify error response
         assert response.status_code == 404
-        data = response.get_json()
-        assert 'error' in data
-        assert data['error'] == 'Feature not found'
+        assert response.get_json() == {'error': 'Feature not found'}
     
-    def test_remove_vote_success(self, client, sample_features, sample_vote_data):
-        """Test successful vote removal."""
-        feature_id = sample_features[0]
-        vote_data = sample_vote_data['valid_vote']
-        
-        # First add a vote
-        client.post(f'/api/features/{feature_id}/vote', json=vote_data)
+    @patch('models.vote.Vote.remove_vote')
+    def test_remove_vote_route_wires_to_model(self, mock_remove_vote, client, sample_vote_data):
+        """Test that the remove-vote route hands the feature and user to Vote.remove_vote."""
+        # The removal itself is covered by the model tests
+        mock_remove_vote.return_value = {
+            'success': True, 'message': 'Vote removed successfully', 'vote_count': 0
+        }
         
-        # Remove the vote
-        response = client.delete(f'/api/features/{feature_id}/vote', json=vote_data)
+        response = client.delete('/api/features/7/vote', json=sample_vote_data['valid_vote'])
         
         # Verify response
+        mock_remove_vote.assert_called_once_with(7, sample_vote_data['valid_vote']['user_id'])
         assert response.status_code == 200
-        data = response.get_json()
-        assert 'message' in data
-        assert data['message'] == 'Vote removed successfully'
-        assert 'vote_count' in data
+        assert response.get_json() == {'message': 'Vote removed successfully', 'vote_count': 0}
     
     def test_remove_vote_not_found(self, client, sample_features, sample_vote_data):
         """Test removing a non-existent vote."""
         feature_id = sample_features[0]
         
         # Try to remove non-existent vote
-        response = client.delete(f'/api/features/{feature_id}/vote', 
+        response = client.delete(VOTE_URL(feature_id), 
                                json=sample_vote_data['valid_vote'])
         
         # Verify error response
         assert response.status_code == 404
-        data = response.get_json()
-        assert 'error' in data
-        assert data['error'] == 'Vote not found'
+        assert response.get_json() == {'error': 'Vote not found'}
     
     def test_remove_vote_no_user_id(self, client, sample_features):
         """Test removing vote without user ID."""
         feature_id = sample_features[0]
         
         # Try to remove vote without user ID
-        response = client.delete(f'/api/features/{feature_id}/vote', json={})
+        response = client.delete(VOTE_URL(feature_id), json={})
         
         # Verify error response
         assert response.status_code == 400
-        data = response.get_json()
-        assert 'error' in data
-        assert data['error'] == 'User ID is required'
+        assert response.get_json() == {'error': 'User ID is required'}
     
-    def test_get_user_votes_success(self, client, sample_features):
+    @pytest.mark.parametrize('body', ['not json', '["user1"]', ''])
+    def test_remove_vote_unusable_body(self, client, sample_features, body):
+        """Test that malformed or non-object bodies are rejected as missing user ID."""
+        response = client.delete(VOTE_URL(sample_features[0]),
+                                 data=body, content_type='application/json')
+        
+        assert response.status_code == 400
+        assert response.get_json() == {'error': 'User ID is required'}
+    
+    def test_get_user_votes_success(self, client, sample_features, db_connection, test_helper):
         """Test getting user's votes."""
         user_id = 'test-user-123'
         
         # Add some votes
-        client.post(f'/api/features/{sample_features[0]}/vote', 
-                   json={'user_id': user_id})
-        client.post(f'/api/features/{sample_features[1]}/vote', 
-                   json={'user_id': user_id})
+        test_helper.seed_votes(db_connection, [(sample_features[0], user_id), (sample_features[1], user_id)])
         
         # Get user votes
-        response = client.get(f'/api/users/{user_id}/votes')
+        response = client.get(USER_VOTES_URL(user_id))
         
         # Verify response
         assert response.status_code == 200
         data = response.get_json()
-        assert 'user_id' in data
-        assert 'voted_features' in data
-        assert 'vote_count' in data
+        assert USER_VOTES_KEYS <= data.keys()
         assert data['user_id'] == user_id
         voted_features = [vote for vote in data['voted_features'] if vote in sample_features[:2]]
         assert len(voted_features) == 2
@@ -330,7 +363,7 @@ class TestVoteAPI:
         user_id = 'non-existent-user'
         
         # Get user votes
-        response = client.get(f'/api/users/{user_id}/votes')
+        response = client.get(USER_VOTES_URL(user_id))
         
         # Verify response
         assert response.status_code == 200
@@ -339,27 +372,88 @@ class TestVoteAPI:
         assert data['voted_features'] == []
         assert data['vote_count'] == 0
     
-    def test_get_feature_votes_success(self, client, sample_features):
+    def test_get_feature_votes_success(self, client, sample_features, db_connection, test_helper):
         """Test getting votes for a specific feature."""
         feature_id = sample_features[0]
         
         # Add some votes
-        client.post(f'/api/features/{feature_id}/vote', 
-                   json={'user_id': 'user1'})
-        client.post(f'/api/features/{feature_id}/vote', 
-                   json={'user_id': 'user2'})
+        test_helper.seed_votes(db_connection, [(feature_id, 'user1'), (feature_id, 'user2')])
         
         # Get feature votes
-        response = client.get(f'/api/features/{feature_id}/votes')
+        response = client.get(FEATURE_VOTES_URL(feature_id))
         
         # Verify response
         assert response.status_code == 200
         data = response.get_json()
-        assert 'feature_id' in data
-        assert 'votes' in data
-        assert 'vote_count' in data
+        assert FEATURE_VOTES_KEYS <= data.keys()
         assert data['feature_id'] == feature_id
         assert len(data['votes']) == 2
+        assert data['vote_count'] == 2
+        assert {vote['user_id'] for vote in data['votes']} == {'user1', 'user2'}
+    
+    def test_vote_listings_refresh_after_writes(self, client, sample_features):
+        """Test that cached vote listings reflect votes and feature deletes."""
+        feature_id = sample_features[0]
+        user_id = 'cached-user'
+        
+        # Prime both caches
+        assert client.get(USER_VOTES_URL(user_id)).get_json()['vote_count'] == 0
+        assert client.get(FEATURE_VOTES_URL(feature_id)).get_json()['vote_count'] == 0
+        
+        # A vote invalidates both listings
+        client.post(VOTE_URL(feature_id), json={'user_id': user_id})
+        assert client.get(USER_VOTES_URL(user_id)).get_json()['voted_features'] == [feature_id]
+        assert client.get(FEATURE_VOTES_URL(feature_id)).get_json()['vote_count'] == 1
+        
+        # Deleting the feature cascades to its votes
+        client.delete(FEATURE_URL(feature_id))
+        assert client.get(USER_VOTES_URL(user_id)).get_json()['voted_features'] == []
+        assert client.get(FEATURE_VOTES_URL(feature_id)).status_code == 404
+    
+    def test_get_user_votes_with_features(self, client, sample_features, sample_votes):
+        """Test embedding the voted features and their counts in the user's votes."""
+        response = client.get('/api/users/user2/votes?include=features')
+        
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['voted_features'] == [sample_features[1], sample_features[2]]
+        assert data['vote_count'] == 2
+        assert [(f['title'], f['vote_count']) for f in data['features']] == [
+            ('User Authentication', 2),
+            ('Search Functionality', 3),
+        ]
+    
+    def test_vote_counts_only(self, client, sample_features, sample_votes):
+        """Test count_only responses for user and feature vote listings."""
+        # user1 voted for three features; the third feature has three votes
+        response = client.get('/api/users/user1/votes?count_only=1')
+        assert response.status_code == 200
+        assert response.get_json() == {'user_id': 'user1', 'vote_count': 3}
+        
+        response = client.get(FEATURE_VOTES_URL(sample_features[2]), query_string={'count_only': 1})
+        assert response.status_code == 200
+        assert response.get_json() == {'feature_id': sample_features[2], 'vote_count': 3}
+        
+        response = client.get('/api/features/999/votes?count_only=1')
+        assert response.status_code == 404
+    
+    def test_large_feature_votes_streamed_uncached(self, app, client, sample_features, sample_votes,
+                                                   monkeypatch):
+        """Test that listings above the stream threshold are streamed and never cached."""
+        monkeypatch.setattr('routes.votes.VOTES_STREAM_THRESHOLD', 2)
+        feature_id = sample_features[2]  # three votes
+        
+        response = client.get(FEATURE_VOTES_URL(feature_id))
+        
+        assert response.is_streamed
+        data = response.get_json()
+        assert [vote['vote_number'] for vote in data['votes']] == [1, 2, 3]
+        assert data['vote_count'] == 3
+        assert len(app.extensions['votes_cache']._entries) == 0
+        
+        # Listings at or below the threshold are still cached
+        client.get(FEATURE_VOTES_URL(sample_features[1]))
+        assert app.extensions['votes_cache'].get(('feature', sample_features[1])) is not None
     
     def test_get_feature_votes_not_found(self, client):
         """Test getting votes for non-existent feature."""
@@ -368,15 +462,14 @@ class TestVoteAPI:
         
         # Verify error response
         assert response.status_code == 404
-        data = response.get_json()
-        assert 'error' in data
-        assert data['error'] == 'Feature not found'
+        assert response.get_json() == {'error': 'Feature not found'}
 
 
 @pytest.mark.unit
 class TestUtilityAPI:
     """Test cases for utility API endpoints."""
     
+    @pytest.mark.smoke
     def test_health_check(self, client):
         """Test health check endpoint."""
         # Health check
@@ -385,9 +478,7 @@ class TestUtilityAPI:
         # Verify response
         assert response.status_code == 200
         data = response.get_json()
-        assert 'status' in data
-        assert 'message' in data
-        assert 'version' in data
+        assert HEALTH_KEYS <= data.keys()
         assert data['status'] == 'healthy'
     
     def test_get_stats(self, client, sample_features, sample_votes):
@@ -398,11 +489,35 @@ class TestUtilityAPI:
         # Verify response
         assert response.status_code == 200
         data = response.get_json()
-        assert 'total_features' in data
-        assert 'total_votes' in data
+        assert STATS_KEYS <= data.keys()
         assert isinstance(data['total_features'], int)
         assert isinstance(data['total_votes'], int)
     
+    def test_get_stats_invalidated_by_writes(self, client, db_connection):
+        """Test that cached stats are refreshed after a successful write."""
+        # Prime the cache
+        assert client.get('/api/stats').get_json()['total_features'] == 0
+        
+        # Rows written behind the API's back are hidden by the cache
+        db_connection.execute("INSERT INTO features (title) VALUES ('Direct')")
+        assert client.get('/api/stats').get_json()['total_features'] == 0
+        
+        # A write through the API invalidates it
+        client.post('/api/features', json={'title': 'Via API'})
+        assert client.get('/api/stats').get_json()['total_features'] == 2
+    
+    def test_pool_health(self, client):
+        """Test connection pool statistics endpoint."""
+        # Get pool stats
+        response = client.get('/api/pool-health')
+        
+        # Verify response
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['size'] >= data['min_size']
+        assert data['size'] <= data['max_size']
+        assert data['in_use'] == data['size'] - data['idle']
+    
     def test_get_stats_empty(self, client):
         """Test getting stats from empty database."""
         # Get stats from empty database
@@ -414,6 +529,7 @@ class TestUtilityAPI:
         # assert data['total_features'] == 0
         # assert data['total_votes'] == 0
     
+    @pytest.mark.smoke
     def test_root_endpoint(self, client):
         """Test root endpoint."""
         # Get root endpoint
@@ -422,11 +538,10 @@ class TestUtilityAPI:
         # Verify response
         assert response.status_code == 200
         data = response.get_json()
-        assert 'message' in data
-        assert 'version' in data
-        assert 'endpoints' in data
+        assert INDEX_KEYS <= data.keys()
         assert data['message'] == 'Feature Voting System API'
     
+    @pytest.mark.smoke
     def test_not_found_endpoint(self, client):
         """Test 404 error handling."""
         # Try to access non-existent endpoint
@@ -434,10 +549,9 @@ class TestUtilityAPI:
         
         # Verify error response
         assert response.status_code == 404
-        data = response.get_json()
-        assert 'error' in data
-        assert data['error'] == 'Endpoint not found'
+        assert response.get_json() == {'error': 'Endpoint not found'}
     
+    @pytest.mark.smoke
     def test_method_not_allowed(self, client):
         """Test 405 error handling."""
         # Try to use wrong HTTP method
@@ -445,9 +559,22 @@ class TestUtilityAPI:
         
         # Verify error response
         assert response.status_code == 405
-        data = response.get_json()
-        assert 'error' in data
-        assert data['error'] == 'Method not allowed'
+        assert response.get_json() == {'error': 'Method not allowed'}
+    
+    def test_cors_preflight_is_cacheable(self, client):
+        """Test that CORS preflight responses carry a cache lifetime."""
+        # Send a preflight request from the Expo web origin
+        response = client.options('/api/features', headers={
+            'Origin': 'http://localhost:19006',
+            'Access-Control-Request-Method': 'POST',
+            'Access-Control-Request-Headers': 'Content-Type'
+        })
+        
+        # Verify preflight headers
+        assert response.status_code == 200
+        assert response.headers['Access-Control-Allow-Origin'] == 'http://localhost:19006'
+        assert response.headers['Access-Control-Max-Age'] == '86400'
+        assert 'Origin' in response.headers.get('Vary', '')
     
     def test_invalid_json(self, client):
         """Test handling of invalid JSON."""
@@ -458,55 +585,83 @@ class TestUtilityAPI:
         
         # Verify error response
         assert response.status_code == 400
+    
+    def test_app_json_uses_orjson(self, app):
+        """Test that Flask's JSON helpers go through the orjson provider."""
+        with app.app_context():
+            response = app.json.response({'id': 1, 'title': 'Dark Mode'})
+        
+        assert response.mimetype == 'application/json'
+        assert response.get_data() == b'{"id":1,"title":"Dark Mode"}'
+        assert app.json.loads(b'{"user_id":"u1"}') == {'user_id': 'u1'}
+
+
+def raise_database_error(*args, **kwargs):
+    """Stand-in for a model method whose query fails."""
+    raise Exception("Database error")
 
 
 @pytest.mark.unit
 class TestErrorHandling:
     """Test cases for error handling."""
     
-    @patch('models.feature.Feature.save')
-    def test_create_feature_database_error(self, mock_save, client, sample_feature_data):
+    # The feature views handle these errors themselves, so they are called
+    # directly inside a request context instead of through routing
+    
+    def test_create_feature_database_error(self, monkeypatch, app, sample_feature_data):
         """Test handling database errors during feature creation."""
-        # Mock database error
-        mock_save.return_value = False
+        # Simulate a failed save
+        monkeypatch.setattr('models.feature.Feature.save', lambda self: False)
         
         # Try to create feature
-        response = client.post('/api/features', 
-                             json=sample_feature_data['valid_feature'])
+        with app.test_request_context('/api/features', method='POST',
+                                      json=sample_feature_data['valid_feature']):
+            response = create_feature()
         
         # Verify error response
         assert response.status_code == 500
-        data = response.get_json()
-        assert 'error' in data
-        assert data['error'] == 'Failed to create feature'
+        assert response.get_json() == {'error': 'Failed to create feature'}
     
-    @patch('models.feature.Feature.get_all_with_votes')
-    def test_get_features_database_error(self, mock_get_all, client):
+    def test_get_features_database_error(self, monkeypatch, app):
         """Test handling database errors during feature retrieval."""
-        # Mock database error
-        mock_get_all.side_effect = Exception("Database error")
+        # Simulate a database error
+        monkeypatch.setattr('models.feature.Feature.get_all_with_votes', raise_database_error)
         
         # Try to get features
-        response = client.get('/api/features')
+        with app.test_request_context('/api/features'):
+            response = get_features()
         
         # Verify error response
         assert response.status_code == 500
-        data = response.get_json()
-        assert 'error' in data
-        assert data['error'] == 'Internal server error'
+        assert response.get_json() == {'error': 'Internal server error'}
     
-    @patch('models.vote.Vote.add_vote')
-    def test_vote_database_error(self, mock_add_vote, client, sample_features):
+    # Vote errors are turned into 500s by the blueprint error handler, so
+    # these go through the client to exercise it
+    
+    def test_vote_database_error(self, monkeypatch, client, sample_features):
         """Test handling database errors during voting."""
-        # Mock database error
-        mock_add_vote.side_effect = Exception("Database error")
+        # Simulate a database error in the batching writer
+        monkeypatch.setattr('models.vote.Vote.add_votes', raise_database_error)
         
         # Try to vote
-        response = client.post(f'/api/features/{sample_features[0]}/vote', 
+        response = client.post(VOTE_URL(sample_features[0]), 
                              json={'user_id': 'test-user'})
         
         # Verify error response
         assert response.status_code == 500
-        data = response.get_json()
-        assert 'error' in data
-        assert data['error'] == 'Internal server error'
\ No newline at end of file
+        assert response.get_json() == {'error': 'Internal server error'}
+    
+    @patch('routes.votes.logger')
+    @patch('models.vote.Vote.get_user_votes')
+    def test_vote_read_error_is_logged(self, mock_get_user_votes, mock_logger, client):
+        """Test that unexpected errors in vote endpoints are logged and return 500."""
+        # Mock database error
+        mock_get_user_votes.side_effect = Exception("Database error")
+        
+        # Try to read a user's votes
+        response = client.get('/api/users/test-user/votes')
+        
+        # Verify error response and log entry
+        assert response.status_code == 500
+        assert response.get_json() == {'error': 'Internal server error'}
+        mock_logger.exception.assert_called_once()
@@ -0,0 +1,88 @@
+"""
+Unit tests for the TTL cache.
+Tests expiry, invalidation and the generation guard against stale writes.
+"""
+
+import pytest
+from unittest.mock import patch
+from utils.cache import TTLCache
+
+
+@pytest.mark.unit
+class TestTTLCache:
+    """Test cases for the TTLCache class."""
+    
+    def test_get_returns_cached_value(self):
+        """Test that a stored value is returned until it expires."""
+        cache = TTLCache(ttl=10)
+        cache.set('key', {'value': 1})
+        
+        assert cache.get('key') == {'value': 1}
+        assert cache.get('missing', 'default') == 'default'
+    
+    def test_entries_expire(self):
+        """Test that entries are dropped once ttl has passed."""
+        cache = TTLCache(ttl=10)
+        with patch('utils.cache.time.monotonic', return_value=100.0):
+            cache.set('key', 'value')
+        
+        with patch('utils.cache.time.monotonic', return_value=109.9):
+            assert cache.get('key') == 'value'
+        with patch('utils.cache.time.monotonic', return_value=110.0):
+            assert cache.get('key') is None
+    
+    def test_delete_and_clear(self):
+        """Test targeted and full invalidation."""
+        cache = TTLCache(ttl=10)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.set('c', 3)
+        
+        cache.delete('a', 'missing')
+        assert cache.get('a') is None
+        assert cache.get('b') == 2
+        
+        cache.clear()
+        assert cache.get('b') is None
+        assert cache.get('c') is None
+    
+    def test_set_skipped_after_concurrent_invalidation(self):
+        """Test that a result read before an invalidation is not cached."""
+        cache = TTLCache(ttl=10)
+        generation = cache.generation
+        
+        # A write invalidates the cache while the reader is querying
+        cache.delete('key')
+        cache.set('key', 'stale', generation)
+        
+        assert cache.get('key') is None
+        cache.set('key', 'fresh', cache.generation)
+        assert cache.get('key') == 'fresh'
+    
+    def test_set_drops_expired_entries(self):
+        """Test that keys never read again do not pile up once expired."""
+        cache = TTLCache(ttl=10)
+        with patch('utils.cache.time.monotonic', return_value=100.0):
+            for i in range(100):
+                cache.set(('user', f'u{i}'), b'{}')
+        
+        # The next insert after they expire sweeps them all out
+        with patch('utils.cache.time.monotonic', return_value=110.0):
+            cache.set('fresh', 'value')
+            assert cache.get('fresh') == 'value'
+        
+        assert len(cache._entries) == 1
+    
+    def test_max_entries_evicts_oldest(self):
+        """Test that live entries beyond max_entries evict the oldest first."""
+        cache = TTLCache(ttl=10, max_entries=3)
+        for key in ('a', 'b', 'c'):
+            cache.set(key, key)
+        
+        # Re-setting 'a' makes it the newest, so 'b' is evicted next
+        cache.set('a', 'a2')
+        cache.set('d', 'd')
+        
+        assert len(cache._entries) == 3
+        assert cache.get('b') is None
+        assert [cache.get(key) for key in ('a', 'c', 'd')] == ['a2', 'c', 'd']
@@ -4,392 +4,668 @@ Tests the Feature and Vote models independently.
 """
 
 import pytest
+import uuid
+from contextlib import contextmanager
 from models.feature import Feature
+from models import vote as vote_sql
 from models.vote import Vote
-from models.database import get_db_connection
+from models.database import (
+    get_db_connection, get_database_stats, write_transaction,
+    init_db, init_pool, close_pool, reset_database, get_pool, is_memory_database, SCHEMA_VERSION
+)
 
 
 @pytest.mark.unit
+@pytest.mark.usefixtures('app_context')
 class TestFeatureModel:
     """Test cases for the Feature model."""
     
     def test_feature_creation(self, app):
         """Test creating a new feature."""
-        with app.app_context():
-            # Create a new feature
-            feature = Feature(
-                title="Test Feature",
-                description="This is a test feature"
-            )
-            
-            # Verify initial state
-            assert feature.title == "Test Feature"
-            assert feature.description == "This is a test feature"
-            assert feature.id is None
-            
-            # Save the feature
-            result = feature.save()
-            
-            # Verify save was successful
-            assert result is True
-            assert feature.id is not None
-            assert isinstance(feature.id, int)
+        # Create a new feature
+        feature = Feature(
+            title="Test Feature",
+            description="This is a test feature"
+        )
+        
+        # Verify initial state
+        assert feature.title == "Test Feature"
+        assert feature.description == "This is a test feature"
+        assert feature.id is None
+        
+        # Save the feature
+        result = feature.save()
+        
+        # Verify save was successful
+        assert result is True
+        assert feature.id is not None
+        assert isinstance(feature.id, int)
     
     def test_feature_creation_minimal(self, app):
         """Test creating a feature with minimal data."""
-        with app.app_context():
-            # Create a feature with only title
-            feature = Feature(title="Minimal Feature")
-            
-            # Save the feature
-            result = feature.save()
-            
-            # Verify save was successful
-            assert result is True
-            assert feature.id is not None
-            assert feature.title == "Minimal Feature"
-            assert feature.description is None
+        # Create a feature with only title
+        feature = Feature(title="Minimal Feature")
+        
+        # Save the feature
+        result = feature.save()
+        
+        # Verify save was successful
+        assert result is True
+        assert feature.id is not None
+        assert feature.title == "Minimal Feature"
+        assert feature.description is None
+    
+    def test_bulk_create(self, app):
+        """Test creating several features in one call."""
+        feature_ids = Feature.bulk_create([
+            {'title': 'First', 'description': 'First description'},
+            {'title': 'Second'},
+        ])
+        
+        # Verify IDs come back in input order
+        assert len(feature_ids) == 2
+        assert Feature.get_by_id(feature_ids[0]).title == 'First'
+        second = Feature.get_by_id(feature_ids[1])
+        assert second.title == 'Second'
+        assert second.description is None
+        assert Feature.bulk_create([]) == []
     
     def test_feature_update(self, app):
         """Test updating an existing feature."""
-        with app.app_context():
-            # Create and save a feature
-            feature = Feature(
-                title="Original Title",
-                description="Original description"
-            )
-            feature.save()
-            original_id = feature.id
-            
-            # Update the feature
-            feature.title = "Updated Title"
-            feature.description = "Updated description"
-            result = feature.save()
-            
-            # Verify update was successful
-            assert result is True
-            assert feature.id == original_id
-            assert feature.title == "Updated Title"
-            assert feature.description == "Updated description"
+        # Create and save a feature
+        feature = Feature(
+            title="Original Title",
+            description="Original description"
+        )
+        feature.save()
+        original_id = feature.id
+        
+        # Update the feature
+        feature.title = "Updated Title"
+        feature.description = "Updated description"
+        result = feature.save()
+        
+        # Verify update was successful
+        assert result is True
+        assert feature.id == original_id
+        assert feature.title == "Updated Title"
+        assert feature.description == "Updated description"
     
     def test_get_by_id(self, app):
         """Test retrieving a feature by ID."""
-        with app.app_context():
-            # Create and save a feature
-            original_feature = Feature(
-                title="Test Feature",
-                description="Test description"
-            )
-            original_feature.save()
-            feature_id = original_feature.id
-            
-            # Retrieve the feature
-            retrieved_feature = Feature.get_by_id(feature_id)
-            
-            # Verify retrieval
-            assert retrieved_feature is not None
-            assert retrieved_feature.id == feature_id
-            assert retrieved_feature.title == "Test Feature"
-            assert retrieved_feature.description == "Test description"
+        # Create and save a feature
+        original_feature = Feature(
+            title="Test Feature",
+            description="Test description"
+        )
+        original_feature.save()
+        feature_id = original_feature.id
+        
+        # Retrieve the feature
+        retrieved_feature = Feature.get_by_id(feature_id)
+        
+        # Verify retrieval
+        assert retrieved_feature is not None
+        assert retrieved_feature.id == feature_id
+        assert retrieved_feature.title == "Test Feature"
+        assert retrieved_feature.description == "Test description"
     
     def test_get_by_id_not_found(self, app):
         """Test retrieving a non-existent feature."""
-        with app.app_context():
-            # Try to retrieve a non-existent feature
-            feature = Feature.get_by_id(999)
-            
-            # Verify it returns None
-            assert feature is None
+        # Try to retrieve a non-existent feature
+        feature = Feature.get_by_id(999)
+        
+        # Verify it returns None
+        assert feature is None
+    
+    def test_get_by_id_with_votes(self, app, sample_features, sample_votes):
+        """Test retrieving a feature together with its vote count."""
+        # Search Functionality has 3 sample votes
+        feature = Feature.get_by_id_with_votes(sample_features[2])
+        
+        # Verify feature data and vote count
+        assert feature is not None
+        assert feature['id'] == sample_features[2]
+        assert feature['title'] == 'Search Functionality'
+        assert feature['vote_count'] == 3
+        
+        # Features without votes report zero
+        assert Feature.get_by_id_with_votes(sample_features[4])['vote_count'] == 0
+        
+        # Missing features return None
+        assert Feature.get_by_id_with_votes(999) is None
     
-    def test_get_all_with_votes(self, app, sample_features, sample_votes):
+    def test_get_all_with_votes(self, app, sample_features, sample_votes, db_connection):
         """Test retrieving all features with vote counts."""
-        with app.app_context():
-            # Get all features with votes
-            features = Feature.get_all_with_votes()
-            
-            # Verify we got features
-            assert len(features) > 0
-            
-            # Check that features have vote counts
-            for feature in features:
-                assert 'vote_count' in feature
-                assert isinstance(feature['vote_count'], int)
-                assert feature['vote_count'] >= 0
-            
-            # Verify features are sorted by vote count (descending)
-            vote_counts = [f['vote_count'] for f in features]
-            assert vote_counts == sorted(vote_counts, reverse=True)
+        # Get all features with votes
+        features = Feature.get_all_with_votes()
+        
+        # Verify we got features
+        assert len(features) > 0
+        
+        # Check that features have vote counts
+        for feature in features:
+            assert 'vote_count' in feature
+            assert isinstance(feature['vote_count'], int)
+            assert feature['vote_count'] >= 0
+        
+        # Verify features are sorted by vote count (descending)
+        vote_counts = [f['vote_count'] for f in features]
+        assert vote_counts == sorted(vote_counts, reverse=True)
+        
+        # Counts and order match votes counted directly with one JOIN
+        cursor = db_connection.execute(
+            'SELECT f.id, COUNT(v.id) AS count FROM features f '
+            'LEFT JOIN votes v ON v.feature_id = f.id GROUP BY f.id '
+            'ORDER BY count DESC, f.created_at DESC, f.id DESC'
+        )
+        expected = [(row['id'], row['count']) for row in cursor.fetchall()]
+        assert [(f['id'], f['vote_count']) for f in features] == expected
+    
+    def test_get_all_with_votes_paginated(self, app, sample_features, sample_votes):
+        """Test retrieving a page of features with LIMIT/OFFSET."""
+        all_features = Feature.get_all_with_votes()
+        
+        # Pages match slices of the full ordered list
+        assert Feature.get_all_with_votes(limit=2) == all_features[:2]
+        assert Feature.get_all_with_votes(limit=2, offset=2) == all_features[2:4]
+        assert Feature.get_all_with_votes(limit=2, offset=len(all_features)) == []
+    
+    def test_count(self, app, sample_features):
+        """Test counting features."""
+        assert Feature.count() == len(sample_features)
     
     def test_delete_feature(self, app):
         """Test deleting a feature."""
-        with app.app_context():
-            # Create and save a feature
-            feature = Feature(title="Feature to Delete")
-            feature.save()
-            feature_id = feature.id
-            
-            # Delete the feature
-            result = Feature.delete(feature_id)
-            
-            # Verify deletion
-            assert result is True
-            
-            # Verify feature is gone
-            deleted_feature = Feature.get_by_id(feature_id)
-            assert deleted_feature is None
+        # Create and save a feature
+        feature = Feature(title="Feature to Delete")
+        feature.save()
+        feature_id = feature.id
+        
+        # Delete the feature
+        result = Feature.delete(feature_id)
+        
+        # Verify deletion
+        assert result is True
+        
+        # Verify feature is gone
+        deleted_feature = Feature.get_by_id(feature_id)
+        assert deleted_feature is None
     
     def test_delete_feature_not_found(self, app):
         """Test deleting a non-existent feature."""
-        with app.app_context():
-            # Try to delete a non-existent feature
-            result = Feature.delete(999)
-            
-            # Verify it returns False
-            assert result is False
+        # Try to delete a non-existent feature
+        result = Feature.delete(999)
+        
+        # Verify it returns False
+        assert result is False
     
-    def test_delete_feature_with_votes(self, app, db_connection):
+    def test_delete_feature_with_votes(self, app, db_connection, test_helper):
         """Test deleting a feature that has votes."""
-        with app.app_context():
-            # Create a feature
-            feature = Feature(title="Feature with Votes")
-            feature.save()
-            feature_id = feature.id
-            
-            # Add a vote
-            Vote.add_vote(feature_id, "test-user")
-            
-            # Delete the feature
-            result = Feature.delete(feature_id)
-            
-            # Verify deletion
-            assert result is True
-            
-            # Verify feature is gone
-            deleted_feature = Feature.get_by_id(feature_id)
-            assert deleted_feature is None
-            
-            # Verify votes are also gone
-            cursor = db_connection.cursor()
-            cursor.execute('SELECT COUNT(*) FROM votes WHERE feature_id = ?', (feature_id,))
-            vote_count = cursor.fetchone()[0]
-            assert vote_count == 0
+        # Create a feature
+        feature = Feature(title="Feature with Votes")
+        feature.save()
+        feature_id = feature.id
+        
+        # Add a vote
+        Vote.add_vote(feature_id, "test-user")
+        
+        # Delete the feature
+        result = Feature.delete(feature_id)
+        
+        # Verify deletion
+        assert result is True
+        
+        # Verify feature is gone
+        deleted_feature = Feature.get_by_id(feature_id)
+        assert deleted_feature is None
+        
+        # Verify votes are also gone
+        assert test_helper.count_votes(db_connection, feature_id) == 0
     
     def test_to_dict(self, app):
         """Test converting feature to dictionary."""
-        with app.app_context():
-            # Create and save a feature
-            feature = Feature(
-                title="Test Feature",
-                description="Test description"
-            )
-            feature.save()
-            
-            # Convert to dictionary
-            feature_dict = feature.to_dict()
-            
-            # Verify dictionary structure
-            assert isinstance(feature_dict, dict)
-            assert 'id' in feature_dict
-            assert 'title' in feature_dict
-            assert 'description' in feature_dict
-            assert 'created_at' in feature_dict
-            assert 'updated_at' in feature_dict
-            
-            # Verify values
-            assert feature_dict['id'] == feature.id
-            assert feature_dict['title'] == "Test Feature"
-            assert feature_dict['description'] == "Test description"
+        # Create and save a feature
+        feature = Feature(
+            title="Test Feature",
+            description="Test description"
+        )
+        feature.save()
+        
+        # Convert to dictionary
+        feature_dict = feature.to_dict()
+        
+        # Verify dictionary structure
+        assert isinstance(feature_dict, dict)
+        assert 'id' in feature_dict
+        assert 'title' in feature_dict
+        assert 'description' in feature_dict
+        assert 'created_at' in feature_dict
+        assert 'updated_at' in feature_dict
+        
+        # Verify values
+        assert feature_dict['id'] == feature.id
+        assert feature_dict['title'] == "Test Feature"
+        assert feature_dict['description'] == "Test description"
 
     def test_get_all_with_votes_empty(self, app):
         """Test retrieving features when database is empty."""
-        with app.app_context():
-            # Get all features from empty database
-            features = Feature.get_all_with_votes()
-            for feature in features:
-                Feature.delete(feature['id'])
-
-            features = Feature.get_all_with_votes()
-            
-            # Verify empty list
-            assert features == []
+        # Each test starts on a fresh, empty database
+        features = Feature.get_all_with_votes()
+        
+        # Verify empty list
+        assert features == []
 
 @pytest.mark.unit
+@pytest.mark.usefixtures('app_context')
 class TestVoteModel:
     """Test cases for the Vote model."""
     
-    def test_add_vote(self, app, sample_features):
-        """Test adding a vote for a feature."""
-        with app.app_context():
-            feature_id = sample_features[0]
-            user_id = "test-user-123"
-            
-            # Add a vote
-            result = Vote.add_vote(feature_id, user_id)
-            
-            # Verify vote was added
-            assert result['success'] is True
-            assert result['message'] == 'Vote added successfully'
+    @pytest.mark.parametrize('user_id', ['test-user-123', None], ids=['given_user', 'generated_user'])
+    def test_add_vote(self, app, sample_features, user_id):
+        """Test adding a vote for a feature, with or without a user ID."""
+        feature_id = sample_features[0]
+        
+        # Add a vote
+        result = Vote.add_vote(feature_id, user_id)
+        
+        # Verify vote was added
+        assert result['success'] is True
+        assert result['message'] == 'Vote added successfully'
+        assert result['vote_count'] == 1
+        if user_id is None:
+            assert uuid.UUID(result['user_id']).version == 4
+        else:
             assert result['user_id'] == user_id
     
-    def test_add_vote_auto_user_id(self, app, sample_features):
-        """Test adding a vote with auto-generated user ID."""
-        with app.app_context():
-            feature_id = sample_features[0]
-            
-            # Add a vote without user ID
-            result = Vote.add_vote(feature_id)
-            
-            # Verify vote was added
-            assert result['success'] is True
-            assert result['message'] == 'Vote added successfully'
-            assert 'user_id' in result
-            assert result['user_id'] is not None
-    
     def test_add_vote_duplicate(self, app, sample_features):
         """Test adding a duplicate vote."""
-        with app.app_context():
-            feature_id = sample_features[0]
-            user_id = "test-user-123"
-            
-            # Add first vote
-            result1 = Vote.add_vote(feature_id, user_id)
-            assert result1['success'] is True
-            
-            # Try to add duplicate vote
-            result2 = Vote.add_vote(feature_id, user_id)
-            
-            # Verify duplicate was rejected
-            assert result2['success'] is False
-            assert result2['message'] == 'User has already voted for this feature'
+        feature_id = sample_features[0]
+        user_id = "test-user-123"
+        
+        # Add first vote
+        result1 = Vote.add_vote(feature_id, user_id)
+        assert result1['success'] is True
+        
+        # Try to add duplicate vote
+        result2 = Vote.add_vote(feature_id, user_id)
+        
+        # Verify duplicate was rejected
+        assert result2['success'] is False
+        assert result2['message'] == 'User has already voted for this feature'
     
     def test_add_vote_nonexistent_feature(self, app):
         """Test adding a vote for a non-existent feature."""
-        with app.app_context():
-            # Try to vote for non-existent feature
-            result = Vote.add_vote(999, "test-user")
-            
-            # Verify vote was rejected
-            assert result['success'] is False
-            assert result['message'] == 'Feature not found'
+        # Try to vote for non-existent feature
+        result = Vote.add_vote(999, "test-user")
+        
+        # Verify vote was rejected
+        assert result['success'] is False
+        assert result['message'] == 'Feature not found'
+    
+    def test_add_votes_repeats_within_batch(self, app, sample_features):
+        """Test that repeated votes in one batch are settled without another insert."""
+        results = Vote.add_votes([
+            (sample_features[0], 'user-1'),
+            (99999, 'user-1'),
+            (sample_features[0], 'user-1'),
+            (99999, 'user-2'),
+        ])
+        
+        assert [r['message'] for r in results] == [
+            'Vote added successfully',
+            'Feature not found',
+            'User has already voted for this feature',
+            'Feature not found',
+        ]
+        assert results[0]['vote_count'] == 1
+    
+    def test_add_votes_other_constraint_failure(self, app, sample_features):
+        """Test that constraint failures other than a missing feature are not reported as 404s."""
+        # user_id is NOT NULL
+        results = Vote.add_votes([(sample_features[0], None), (sample_features[0], 'user-1')])
+        
+        assert results[0] == {'success': False, 'message': 'Error adding vote'}
+        assert results[1]['success'] is True
+    
+    def test_add_votes_poisoned_vote_fails_alone(self, app, sample_features):
+        """Test that a vote SQLite cannot bind fails without failing the rest of the batch."""
+        results = Vote.add_votes([
+            (sample_features[0], 'alice'),
+            (sample_features[0], 1.5j),  # unsupported parameter type
+            (sample_features[0], ['x']),  # unhashable as well as unbindable
+            (2 ** 64, 'bob'),  # too large for an SQLite INTEGER
+            (sample_features[1], 'bob'),
+        ])
+        
+        assert [r['success'] for r in results] == [True, False, False, False, True]
+        assert results[1:4] == [{'success': False, 'message': 'Error adding vote'}] * 3
+        assert results[0]['vote_count'] == 1
+        assert results[4]['vote_count'] == 1
+        assert Vote.get_vote_count(sample_features[0]) == 1
+    
+    def test_add_votes_batch(self, app, sample_features):
+        """Test adding several votes in one transaction with per-vote results."""
+        results = Vote.add_votes([
+            (sample_features[0], 'user-1'),
+            (sample_features[0], 'user-2'),
+            (sample_features[0], 'user-1'),
+            (99999, 'user-1'),
+        ])
+        
+        assert [r['success'] for r in results] == [True, True, False, False]
+        assert results[0]['vote_count'] == 2
+        assert results[1]['vote_count'] == 2
+        assert results[2]['message'] == 'User has already voted for this feature'
+        assert results[3]['message'] == 'Feature not found'
+        assert Vote.get_vote_count(sample_features[0]) == 2
     
     def test_remove_vote(self, app, sample_features):
         """Test removing a vote."""
-        with app.app_context():
-            feature_id = sample_features[0]
-            user_id = "test-user-123"
-            
-            # Add a vote first
-            Vote.add_vote(feature_id, user_id)
-            
-            # Remove the vote
-            result = Vote.remove_vote(feature_id, user_id)
-            
-            # Verify vote was removed
-            assert result['success'] is True
-            assert result['message'] == 'Vote removed successfully'
+        feature_id = sample_features[0]
+        user_id = "test-user-123"
+        
+        # Add a vote first
+        Vote.add_vote(feature_id, user_id)
+        
+        # Remove the vote
+        result = Vote.remove_vote(feature_id, user_id)
+        
+        # Verify vote was removed
+        assert result['success'] is True
+        assert result['message'] == 'Vote removed successfully'
+        assert result['vote_count'] == 0
     
     def test_remove_vote_not_found(self, app, sample_features):
         """Test removing a non-existent vote."""
-        with app.app_context():
-            feature_id = sample_features[0]
-            user_id = "test-user-123"
-            
-            # Try to remove non-existent vote
-            result = Vote.remove_vote(feature_id, user_id)
-            
-            # Verify removal failed
-            assert result['success'] is False
-            assert result['message'] == 'Vote not found'
+        feature_id = sample_features[0]
+        user_id = "test-user-123"
+        
+        # Try to remove non-existent vote
+        result = Vote.remove_vote(feature_id, user_id)
+        
+        # Verify removal failed
+        assert result['success'] is False
+        assert result['message'] == 'Vote not found'
     
     def test_has_voted(self, app, sample_features):
         """Test checking if user has voted."""
-        with app.app_context():
-            feature_id = sample_features[0]
-            user_id = "test-user-123"
-            
-            # Initially user hasn't voted
-            assert Vote.has_voted(feature_id, user_id) is False
-            
-            # Add a vote
-            Vote.add_vote(feature_id, user_id)
-            
-            # Now user has voted
-            assert Vote.has_voted(feature_id, user_id) is True
+        feature_id = sample_features[0]
+        user_id = "test-user-123"
+        
+        # Initially user hasn't voted
+        assert Vote.has_voted(feature_id, user_id) is False
+        
+        # Add a vote
+        Vote.add_vote(feature_id, user_id)
+        
+        # Now user has voted
+        assert Vote.has_voted(feature_id, user_id) is True
     
-    def test_get_user_votes(self, app, sample_features):
-        """Test getting all votes by a user."""
-        with app.app_context():
-            user_id = "test-user-123"
-            
-            # Add votes for multiple features
-            Vote.add_vote(sample_features[0], user_id)
-            Vote.add_vote(sample_features[1], user_id)
-            
-            # Get user votes
-            user_votes = Vote.get_user_votes(user_id)
-
-            user_votes = [vote for vote in user_votes if vote in sample_features[:2]]
-            
-            # Verify user votes
-            assert len(user_votes) == 2
-            assert sample_features[0] in user_votes
-            assert sample_features[1] in user_votes
+    def test_get_user_votes(self, app, sample_features, monkeypatch):
+        """Test getting all votes by a user with a single query."""
+        user_id = "test-user-123"
+        
+        # Add votes for multiple features
+        Vote.add_vote(sample_features[0], user_id)
+        Vote.add_vote(sample_features[1], user_id)
+        
+        # Record every statement the lookup runs on its pooled connection
+        statements = []
+        borrow = vote_sql.get_db_connection
+        
+        @contextmanager
+        def traced_connection():
+            with borrow() as conn:
+                conn.set_trace_callback(statements.append)
+                try:
+                    yield conn
+                finally:
+                    conn.set_trace_callback(None)
+        
+        monkeypatch.setattr(vote_sql, 'get_db_connection', traced_connection)
+        
+        # Get user votes
+        user_votes = Vote.get_user_votes(user_id)
+        
+        # Verify user votes
+        assert set(user_votes) == {sample_features[0], sample_features[1]}
+        assert len(statements) == 1
     
     def test_get_user_votes_empty(self, app):
         """Test getting votes for user who hasn't voted."""
-        with app.app_context():
-            # Get votes for non-existent user
-            user_votes = Vote.get_user_votes("non-existent-user")
-            
-            # Verify empty list
-            assert user_votes == []
+        # Get votes for non-existent user
+        user_votes = Vote.get_user_votes("non-existent-user")
+        
+        # Verify empty list
+        assert user_votes == []
+    
+    def test_count_user_votes(self, app, sample_votes):
+        """Test counting a user's votes."""
+        assert Vote.count_user_votes('user1') == 3
+        assert Vote.count_user_votes('user3') == 1
+        assert Vote.count_user_votes('nobody') == 0
+    
+    def test_user_votes_use_covering_index(self, app, db_connection):
+        """Test that per-user vote lookups are served from the covering index."""
+        cursor = db_connection.cursor()
+        cursor.execute('EXPLAIN QUERY PLAN SELECT feature_id FROM votes WHERE user_id = ?',
+                       ('test-user',))
+        plan = ' '.join(row['detail'] for row in cursor.fetchall())
+        
+        assert 'COVERING INDEX idx_votes_user_feature' in plan
+    
+    @pytest.mark.parametrize('sql, params, step', [
+        ('SQL_COUNT_FEATURE_VOTES', (1,), 'SEARCH features USING INTEGER PRIMARY KEY'),
+        ('SQL_HAS_VOTED', (1, 'u'), 'SEARCH votes USING COVERING INDEX sqlite_autoindex_votes_1'),
+        ('SQL_DELETE_VOTE', (1, 'u'), 'SEARCH votes USING INDEX sqlite_autoindex_votes_1'),
+        ('SQL_COUNT_USER_VOTES', ('u',), 'SEARCH votes USING COVERING INDEX idx_votes_user_feature'),
+        ('SQL_GET_FEATURE_VOTES', (1,), 'SEARCH votes USING INDEX idx_votes_feature_id'),
+    ])
+    def test_vote_lookups_use_indexes(self, app, db_connection, sql, params, step):
+        """Test that vote lookups search an index instead of scanning the table."""
+        cursor = db_connection.execute('EXPLAIN QUERY PLAN ' + getattr(vote_sql, sql), params)
+        plan = ' '.join(row['detail'] for row in cursor.fetchall())
+        
+        assert step in plan
+        assert 'TEMP B-TREE' not in plan
     
     def test_get_vote_count(self, app, sample_features):
         """Test getting vote count for a feature."""
-        with app.app_context():
-            feature_id = sample_features[0]
-            
-            # Initially no votes
-            assert Vote.get_vote_count(feature_id) == 0
-            
-            # Add some votes
-            Vote.add_vote(feature_id, "user1")
-            Vote.add_vote(feature_id, "user2")
-            Vote.add_vote(feature_id, "user3")
-            
-            # Check vote count
-            assert Vote.get_vote_count(feature_id) == 3
+        feature_id = sample_features[0]
+        
+        # Initially no votes
+        assert Vote.get_vote_count(feature_id) == 0
+        
+        # Add some votes
+        Vote.add_vote(feature_id, "user1")
+        Vote.add_vote(feature_id, "user2")
+        Vote.add_vote(feature_id, "user3")
+        
+        # Check vote count
+        assert Vote.get_vote_count(feature_id) == 3
     
     def test_get_votes_by_feature(self, app, sample_features):
         """Test getting all votes for a feature."""
-        with app.app_context():
-            feature_id = sample_features[0]
-            
-            # Add some votes
-            Vote.add_vote(feature_id, "user1")
-            Vote.add_vote(feature_id, "user2")
-            
-            # Get votes for feature
-            votes = Vote.get_votes_by_feature(feature_id)
-            
-            # Verify votes
-            assert len(votes) == 2
-            
-            # Check vote structure
-            for vote in votes:
-                assert 'id' in vote
-                assert 'feature_id' in vote
-                assert 'user_id' in vote
-                assert 'created_at' in vote
-                assert vote['feature_id'] == feature_id
+        feature_id = sample_features[0]
+        
+        # Add some votes
+        Vote.add_vote(feature_id, "user1")
+        Vote.add_vote(feature_id, "user2")
+        
+        # Get votes for feature
+        votes = Vote.get_votes_by_feature(feature_id)
+        
+        # Verify votes
+        assert len(votes) == 2
+        
+        # Check vote structure
+        for vote in votes:
+            assert 'id' in vote
+            assert 'feature_id' in vote
+            assert 'user_id' in vote
+            assert 'created_at' in vote
+            assert vote['feature_id'] == feature_id
+        
+        # Votes come back in the order they were cast, numbered from 1
+        assert [(vote['user_id'], vote['vote_number']) for vote in votes] == [('user1', 1), ('user2', 2)]
+    
+    def test_iter_votes_by_feature(self, app, sample_features, sample_votes):
+        """Test reading a feature's votes in batches."""
+        batches = list(Vote.iter_votes_by_feature(sample_features[2], batch_size=2))
+        
+        assert [len(batch) for batch in batches] == [2, 1]
+        assert {vote['user_id'] for batch in batches for vote in batch} == {'user1', 'user2', 'user3'}
+        assert [vote['vote_number'] for batch in batches for vote in batch] == [1, 2, 3]
+        assert get_pool().stats()['in_use'] == 1  # only the db_connection fixture
     
     def test_get_votes_by_feature_empty(self, app, sample_features):
         """Test getting votes for feature with no votes."""
+        feature_id = sample_features[0]
+        
+        # Get votes for feature with no votes
+        votes = Vote.get_votes_by_feature(feature_id)
+        
+        # Verify empty list
+        assert votes == []
+
+
+@pytest.mark.unit
+class TestDatabaseStats:
+    """Test cases for database statistics."""
+    
+    def test_get_database_stats(self, app, sample_features, sample_votes):
+        """Test statistics with features and votes."""
         with app.app_context():
-            feature_id = sample_features[0]
+            stats = get_database_stats()
             
-            # Get votes for feature with no votes
-            votes = Vote.get_votes_by_feature(feature_id)
+            assert stats['total_features'] == len(sample_features)
+            assert stats['total_votes'] == len(sample_votes)
+            assert stats['top_feature'] == {'title': 'Search Functionality', 'vote_count': 3}
+    
+    def test_get_database_stats_empty(self, app):
+        """Test statistics for an empty database."""
+        with app.app_context():
+            stats = get_database_stats()
             
-            # Verify empty list
-            assert votes == []
\ No newline at end of file
+            assert stats == {'total_features': 0, 'total_votes': 0, 'top_feature': None}
+
+
+@pytest.mark.unit
+class TestWriteTransaction:
+    """Test cases for explicit write transactions."""
+    
+    def test_commits_on_success(self, app, db_connection):
+        """Test that writes are committed when the block completes."""
+        with write_transaction(db_connection) as cursor:
+            cursor.execute('INSERT INTO features (title) VALUES (?)', ('Committed',))
+        
+        assert not db_connection.in_transaction
+        cursor = db_connection.execute('SELECT COUNT(*) AS count FROM features')
+        assert cursor.fetchone()['count'] == 1
+    
+    def test_rolls_back_on_error(self, app, db_connection):
+        """Test that every write in the block is undone when it raises."""
+        with pytest.raises(RuntimeError):
+            with write_transaction(db_connection) as cursor:
+                cursor.execute('INSERT INTO features (title) VALUES (?)', ('Rolled back',))
+                raise RuntimeError('boom')
+        
+        assert not db_connection.in_transaction
+        cursor = db_connection.execute('SELECT COUNT(*) AS count FROM features')
+        assert cursor.fetchone()['count'] == 0
+
+
+@pytest.mark.unit
+class TestConnectionSettings:
+    """Test cases for per-connection SQLite settings."""
+    
+    def test_pooled_connections_use_tuned_pragmas(self, app, db_connection):
+        """Test that tests exercise the same PRAGMAs as production connections."""
+        def pragma(name):
+            return next(iter(db_connection.execute(f'PRAGMA {name}').fetchone().values()))
+        
+        assert pragma('synchronous') == 1  # NORMAL
+        assert pragma('busy_timeout') == 5000
+        assert pragma('temp_store') == 2  # MEMORY
+        assert pragma('foreign_keys') == 1
+        assert db_connection.isolation_level is None
+    
+    def test_test_database_stays_in_memory(self, app, db_connection):
+        """Test that the suite runs against memory, so commits never wait on fsync."""
+        assert is_memory_database(get_pool().database)
+        assert db_connection.execute('PRAGMA journal_mode').fetchone()['journal_mode'] == 'memory'
+    
+    def test_file_database_uses_wal(self, tmp_path):
+        """Test that init_db switches file-backed databases to WAL."""
+        init_pool(str(tmp_path / 'wal.db'))
+        try:
+            init_db()
+            with get_db_connection() as conn:
+                assert conn.execute('PRAGMA journal_mode').fetchone()['journal_mode'] == 'wal'
+        finally:
+            close_pool()
+
+
+@pytest.mark.unit
+class TestSchema:
+    """Test cases for schema initialization."""
+    
+    def test_init_db_records_schema_version(self, app, db_connection):
+        """Test that init_db stamps the schema version and is safe to repeat."""
+        init_db()
+        
+        cursor = db_connection.execute('PRAGMA user_version')
+        assert cursor.fetchone()['user_version'] == SCHEMA_VERSION
+    
+    def test_reset_database_recreates_schema(self, app, sample_votes, db_connection):
+        """Test that reset_database drops all data and rebuilds the tables."""
+        reset_database()
+        
+        cursor = db_connection.execute(
+            'SELECT (SELECT COUNT(*) FROM features) AS features, (SELECT COUNT(*) FROM votes) AS votes'
+        )
+        assert cursor.fetchone() == {'features': 0, 'votes': 0}
+    
+    def test_vote_count_tracks_vote_changes(self, app, sample_features, db_connection):
+        """Test that the triggers keep features.vote_count in step with votes."""
+        feature_id = sample_features[0]
+        with write_transaction(db_connection) as cursor:
+            cursor.executemany(
+                'INSERT INTO votes (feature_id, user_id) VALUES (?, ?)',
+                [(feature_id, 'user-1'), (feature_id, 'user-2'), (sample_features[1], 'user-1')]
+            )
+            cursor.execute('DELETE FROM votes WHERE feature_id = ? AND user_id = ?', (feature_id, 'user-2'))
+        
+        cursor = db_connection.execute('SELECT id, vote_count FROM features ORDER BY id')
+        counts = {row['id']: row['vote_count'] for row in cursor}
+        assert counts[feature_id] == 1
+        assert counts[sample_features[1]] == 1
+        assert counts[sample_features[2]] == 0
+    
+    def test_init_db_backfills_vote_count(self, app, db_connection):
+        """Test that a version 1 database gains a backfilled vote_count column."""
+        with write_transaction(db_connection) as cursor:
+            cursor.execute('DROP TABLE votes')
+            cursor.execute('DROP TABLE features')
+            cursor.execute(
+                'CREATE TABLE features (id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT NOT NULL, '
+                'description TEXT NOT NULL, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, '
+                'updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)'
+            )
+            cursor.execute(
+                'CREATE TABLE votes (id INTEGER PRIMARY KEY AUTOINCREMENT, feature_id INTEGER NOT NULL, '
+                'user_id TEXT NOT NULL, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, '
+                'FOREIGN KEY (feature_id) REFERENCES features (id) ON DELETE CASCADE, '
+                'UNIQUE(feature_id, user_id))'
+            )
+            cursor.execute("INSERT INTO features (title, description) VALUES ('Old', 'Feature')")
+            cursor.executemany(
+                'INSERT INTO votes (feature_id, user_id) VALUES (1, ?)', [('user-1',), ('user-2',)]
+            )
+        db_connection.execute('PRAGMA user_version = 1')
+        
+        init_db()
+        
+        assert Vote.get_vote_count(1) == 2
+        assert Vote.add_vote(1, 'user-3')['vote_count'] == 3
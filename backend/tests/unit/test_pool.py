@@ -0,0 +1,107 @@
+"""
+Unit tests for the SQLite connection pool.
+Tests connection reuse, sizing limits and idle reaping.
+"""
+
+import pytest
+from unittest.mock import patch
+from models.database import connect
+from models.pool import ConnectionPool
+
+
+@pytest.fixture
+def pool(tmp_path):
+    """
+    Create a small connection pool over a temporary database.
+    
+    Returns:
+        ConnectionPool: Pool with min_size=1 and max_size=2
+    """
+    pool = ConnectionPool(str(tmp_path / 'pool.db'), connect, min_size=1, max_size=2)
+    yield pool
+    pool.close()
+
+
+@pytest.mark.unit
+class TestConnectionPool:
+    """Test cases for the ConnectionPool class."""
+    
+    def test_prewarms_min_size(self, pool):
+        """Test that the pool opens min_size connections up front."""
+        stats = pool.stats()
+        assert stats['size'] == 1
+        assert stats['idle'] == 1
+        assert stats['in_use'] == 0
+    
+    def test_released_connection_is_reused(self, pool):
+        """Test that a released connection is handed out again."""
+        with pool.connection() as first:
+            pass
+        with pool.connection() as second:
+            assert second is first
+    
+    def test_grows_up_to_max_size(self, pool):
+        """Test that the pool opens new connections up to max_size and then times out."""
+        first = pool.acquire()
+        second = pool.acquire()
+        assert first is not second
+        assert pool.stats()['in_use'] == 2
+        
+        with pytest.raises(TimeoutError):
+            pool.acquire(timeout=0.01)
+        
+        pool.release(first)
+        pool.release(second)
+        assert pool.stats()['idle'] == 2
+    
+    def test_release_rolls_back_open_transaction(self, pool):
+        """Test that uncommitted work is discarded when a connection is released."""
+        with pool.connection() as conn:
+            conn.execute('CREATE TABLE items (id INTEGER PRIMARY KEY)')
+            conn.execute('BEGIN')
+            conn.execute('INSERT INTO items DEFAULT VALUES')
+            assert conn.in_transaction
+        
+        with pool.connection() as conn:
+            assert not conn.in_transaction
+            assert conn.execute('SELECT COUNT(*) as count FROM items').fetchone()['count'] == 0
+    
+    def test_recently_released_connection_skips_ping(self, pool):
+        """Test that a connection released within ping_after is handed out unchecked."""
+        with pool.connection():
+            pass
+        
+        with patch.object(ConnectionPool, '_is_healthy') as is_healthy:
+            with pool.connection():
+                pass
+        
+        is_healthy.assert_not_called()
+    
+    def test_stale_broken_connection_is_replaced(self, pool):
+        """Test that an idle connection failing its ping is discarded and replaced."""
+        pool.ping_after = 0
+        with pool.connection() as broken:
+            pass
+        broken.close()
+        
+        with pool.connection() as conn:
+            assert conn is not broken
+            assert conn.execute('SELECT 1 AS one').fetchone()['one'] == 1
+        assert pool.stats()['size'] == 1
+    
+    def test_reaps_idle_connections_above_min_size(self, pool):
+        """Test that idle connections beyond min_size are closed after the timeout."""
+        pool.idle_timeout = 0
+        first = pool.acquire()
+        second = pool.acquire()
+        pool.release(first)
+        pool.release(second)
+        
+        assert pool.stats()['size'] == 1
+    
+    def test_closed_pool_rejects_acquire(self, pool):
+        """Test that a closed pool refuses to hand out connections."""
+        pool.close()
+        
+        with pytest.raises(RuntimeError):
+            pool.acquire()
@@ -0,0 +1,87 @@
+"""
+Unit tests for the coalescing vote writer.
+Tests batching of concurrent votes, error propagation and idle shutdown.
+"""
+
+import threading
+import time
+import pytest
+from unittest.mock import patch
+from models.vote_writer import VoteWriter
+
+
+def fake_add_votes(votes):
+    """Pretend every vote succeeds, reporting how many votes were in its batch."""
+    return [{'success': True, 'user_id': user_id, 'vote_count': len(votes)}
+            for _, user_id in votes]
+
+
+@pytest.mark.unit
+class TestVoteWriter:
+    """Test cases for the VoteWriter class."""
+    
+    def test_submit_returns_result(self):
+        """Test that a single vote is written and its result returned."""
+        writer = VoteWriter(idle_timeout=0.05)
+        
+        with patch('models.vote_writer.Vote.add_votes', side_effect=fake_add_votes):
+            result = writer.submit(1, 'user-1')
+        
+        assert result == {'success': True, 'user_id': 'user-1', 'vote_count': 1}
+    
+    def test_concurrent_votes_share_a_batch(self):
+        """Test that votes queued while the writer is busy are written together."""
+        writer = VoteWriter(idle_timeout=0.05)
+        batches = []
+        release = threading.Event()
+        
+        def blocking_add_votes(votes):
+            batches.append(list(votes))
+            if len(batches) == 1:
+                release.wait(5)
+            return fake_add_votes(votes)
+        
+        results = {}
+        def vote(user_id):
+            results[user_id] = writer.submit(1, user_id)
+        
+        with patch('models.vote_writer.Vote.add_votes', side_effect=blocking_add_votes):
+            threads = [threading.Thread(target=vote, args=('first',))]
+            threads[0].start()
+            while not batches:
+                time.sleep(0.001)
+            
+            # Queue four more votes while the first batch is still writing
+            for i in range(4):
+                threads.append(threading.Thread(target=vote, args=(f'user-{i}',)))
+                threads[-1].start()
+            while writer._queue.qsize() < 4:
+                time.sleep(0.001)
+            release.set()
+            
+            for thread in threads:
+                thread.join(5)
+        
+        assert [len(batch) for batch in batches] == [1, 4]
+        assert len(results) == 5
+        assert all(result['success'] for result in results.values())
+    
+    def test_batch_error_is_raised_in_submitter(self):
+        """Test that a failed batch write surfaces in the calling thread."""
+        writer = VoteWriter(idle_timeout=0.05)
+        
+        with patch('models.vote_writer.Vote.add_votes', side_effect=RuntimeError('disk full')):
+            with pytest.raises(RuntimeError, match='disk full'):
+                writer.submit(1, 'user-1')
+    
+    def test_thread_exits_when_idle(self):
+        """Test that the writer thread stops after idle_timeout and restarts on demand."""
+        writer = VoteWriter(idle_timeout=0.01)
+        
+        with patch('models.vote_writer.Vote.add_votes', side_effect=fake_add_votes):
+            writer.submit(1, 'user-1')
+            thread = writer._thread
+            thread.join(1)
+            assert not thread.is_alive()
+            
+            assert writer.submit(1, 'user-2')['success'] is True
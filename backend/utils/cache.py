@@ -0,0 +1,64 @@
+import threading
+import time
+from collections import OrderedDict
+
+class TTLCache:
+    """
+    Small thread-safe key/value cache whose entries expire after ``ttl`` seconds.
+    Uses the monotonic clock so wall-clock adjustments cannot extend entries.
+
+    Every entry shares the same ttl, so insertion order is expiry order:
+    set() drops expired entries from the front of the OrderedDict and, past
+    ``max_entries``, evicts the oldest live one. Keys that are never read
+    again (e.g. one per user ID in a URL) cannot accumulate.
+
+    Every invalidation bumps ``generation``. A reader that captures it before
+    querying and passes it to set() cannot store a result computed before a
+    concurrent write invalidated the cache.
+    """
+
+    def __init__(self, ttl, max_entries=1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.generation = 0
+        self._entries = OrderedDict()  # key -> (expires_at, value), oldest first
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """Return the cached value for key, or default if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return default
+            return entry[1]
+
+    def set(self, key, value, generation=None):
+        """Cache value under key for ttl seconds, unless invalidated since generation."""
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            now = time.monotonic()
+            # Re-insert so the key moves to the back with its new expiry
+            self._entries.pop(key, None)
+            while self._entries:
+                expires_at, _ = next(iter(self._entries.values()))
+                if expires_at > now and len(self._entries) < self.max_entries:
+                    break
+                self._entries.popitem(last=False)
+            self._entries[key] = (now + self.ttl, value)
+
+    def delete(self, *keys):
+        """Drop the given keys."""
+        with self._lock:
+            self.generation += 1
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        """Drop every entry."""
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
@@ -1,28 +1,149 @@
-import uuid
+import os
 from datetime import datetime
+from functools import wraps
+
+import orjson
+from flask import current_app, request
+from flask.json.provider import JSONProvider
 
 def generate_user_id():
-    """Generate a unique user ID."""
-    return str(uuid.uuid4())
+    """
+    Generate a unique user ID in random (version 4) UUID form.
+    Formats 16 random bytes directly, skipping the cost of building a uuid.UUID.
+    """
+    h = os.urandom(16).hex()
+    # Set the version nibble to 4 and the variant bits to 10
+    return f"{h[:8]}-{h[8:12]}-4{h[13:16]}-{'89ab'[int(h[16], 16) & 3]}{h[17:20]}-{h[20:]}"
 
 def format_timestamp(timestamp):
-    """Format timestamp for display."""
+    """
+    Format timestamp for display as YYYY-MM-DD HH:MM:SS.
+    Uses isoformat, which skips strftime's format parsing; naive datetimes
+    (the kind SQLite hands back) get no UTC offset appended.
+    """
     if isinstance(timestamp, str):
         return timestamp
-    return timestamp.strftime('%Y-%m-%d %H:%M:%S') if timestamp else None
+    return timestamp.isoformat(sep=' ', timespec='seconds') if timestamp else None
 
 def validate_feature_data(data):
     """Validate feature creation data."""
     if not data:
         return False, "No data provided"
     
-    if not data.get('title') or not data.get('title').strip():
+    # Look each field up once
+    title = data.get('title')
+    if not title or not title.strip():
         return False, "Title is required"
     
-    if len(data.get('title', '')) > 200:
+    if len(title) > 200:
         return False, "Title too long (max 200 characters)"
     
     if len(data.get('description', '')) > 1000:
         return False, "Description too long (max 1000 characters)"
     
-    return True, "Valid"
\ No newline at end of file
+    return True, "Valid"
+
+class OrjsonProvider(JSONProvider):
+    """
+    Flask JSON provider backed by orjson.
+    Installed on the app so request.get_json() and jsonify() use the C
+    encoder and decoder too. orjson output is always compact and takes no
+    formatting options, so extra keyword arguments are ignored.
+    """
+    
+    def dumps(self, obj, **kwargs):
+        """Serialize obj to a JSON string."""
+        return orjson.dumps(obj).decode()
+    
+    def loads(self, s, **kwargs):
+        """Deserialize a JSON string or bytes."""
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        """Build a JSON response without going through a str."""
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(orjson.dumps(obj), mimetype='application/json')
+
+def json_response(data, status=200):
+    """
+    Build a JSON response serialized with orjson.
+    orjson is a C extension and encodes large lists of rows much faster
+    than the stdlib json module behind flask.jsonify.
+    
+    Args:
+        data: JSON-serializable object
+        status (int): HTTP status code
+        
+    Returns:
+        Response: Flask response with application/json body
+    """
+    return current_app.response_class(orjson.dumps(data), status=status,
+                                      mimetype='application/json')
+
+def json_bytes_response(body, status=200):
+    """
+    Build a JSON response from an already-serialized body.
+    Lets fixed payloads be encoded once at import time; a new Response is
+    still created per request because after_request hooks (CORS) mutate it.
+    
+    Args:
+        body (bytes): Serialized JSON
+        status (int): HTTP status code
+        
+    Returns:
+        Response: Flask response with application/json body
+    """
+    return current_app.response_class(body, status=status, mimetype='application/json')
+
+def json_endpoint(view):
+    """
+    Decorate a view that returns ``(payload, status)`` instead of a response.
+    A dict or list payload is encoded with orjson; bytes are sent as
+    already-serialized JSON. Full responses (e.g. streams) pass through.
+    
+    Args:
+        view (callable): Flask view function
+        
+    Returns:
+        callable: View that builds the JSON response
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        rv = view(*args, **kwargs)
+        if not isinstance(rv, tuple):
+            return rv
+        payload, status = rv
+        if isinstance(payload, bytes):
+            return json_bytes_response(payload, status)
+        return json_response(payload, status)
+    return wrapper
+
+def parse_json_object(raw):
+    """
+    Decode a request body as a JSON object with orjson.
+    
+    Args:
+        raw (bytes): Raw request body
+        
+    Returns:
+        dict: Parsed object, or None if the body is invalid JSON or not an object
+    """
+    try:
+        data = orjson.loads(raw)
+    except orjson.JSONDecodeError:
+        return None
+    return data if isinstance(data, dict) else None
+
+def read_json_object():
+    """
+    Parse the request body as a JSON object with orjson.
+    Reads the raw bytes once without caching them and skips werkzeug's
+    content-type negotiation and stdlib json decoding.
+    
+    Returns:
+        dict: Parsed object, or None if the body is empty, invalid or not an object
+    """
+    raw = request.get_data(cache=False)
+    if not raw:
+        return None
+    return parse_json_object(raw)
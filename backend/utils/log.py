@@ -0,0 +1,40 @@
+import atexit
+import logging
+import queue
+import sys
+import threading
+from logging.handlers import QueueHandler, QueueListener
+
+LOGGER_NAME = 'feature_voting'
+LOG_FORMAT = '%(asctime)s %(levelname)s %(name)s: %(message)s'
+
+_listener = None
+_lock = threading.Lock()
+
+def _configure():
+    """
+    Route the app's log records through a queue to a background writer.
+    Request threads only enqueue records, so they never block on stderr.
+    """
+    global _listener
+    with _lock:
+        if _listener is not None:
+            return
+
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        log_queue = queue.SimpleQueue()
+        _listener = QueueListener(log_queue, handler)
+        _listener.start()
+        atexit.register(_listener.stop)
+
+        logger = logging.getLogger(LOGGER_NAME)
+        logger.addHandler(QueueHandler(log_queue))
+        logger.setLevel(logging.INFO)
+        # Keep records away from the root logger's synchronous handlers
+        logger.propagate = False
+
+def get_logger(name):
+    """Get a child of the app logger, setting up queued output on first use."""
+    _configure()
+    return logging.getLogger(f'{LOGGER_NAME}.{name}')
@@ -0,0 +1,10 @@
+"""
+WSGI entry point for the Feature Voting System.
+Production servers import the application from here, for example:
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+"""
+
+from app import create_app
+
+app = create_app()